@@ -3,7 +3,7 @@ from PyInstaller.utils.hooks import collect_all
 
 datas = [('assets', 'assets'), ('config.json', '.'), ('debug_config.json', '.')]
 binaries = []
-hiddenimports = ['customtkinter', 'PIL', 'PIL._tkinter_finder', 'pygame', 'pystray', 'plyer', 'cv2']
+hiddenimports = ['customtkinter', 'PIL', 'PIL._tkinter_finder', 'pygame', 'pystray', 'plyer', 'cv2', 'src.video_pipeline']
 tmp_ret = collect_all('customtkinter')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 tmp_ret = collect_all('PIL')
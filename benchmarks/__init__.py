@@ -0,0 +1,4 @@
+"""
+BreakReminder 启动与热路径基准测试
+在仓库根目录运行: python -m benchmarks.run_benchmarks --output bench.json
+"""
@@ -0,0 +1,35 @@
+import sys
+import subprocess
+from typing import Dict
+
+from benchmarks.common import summarize
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); "
+    "import src.break_reminder; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def run(repo_root: str, repeat: int = 5) -> Dict[str, Dict]:
+    """
+    在全新的解释器中测量 import src.break_reminder 的耗时
+    :param repo_root: 仓库根目录
+    :param repeat: 次数
+    """
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=repo_root,
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+
+    # 检查重量级依赖确实没有在导入时加载
+    check = subprocess.run(
+        [sys.executable, "-c", "import sys, src.break_reminder; "
+                               "print(','.join(m for m in ('cv2', 'pygame', 'plyer', 'pystray') if m in sys.modules))"],
+        cwd=repo_root, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+    result = summarize(samples)
+    result["eager_heavy_modules"] = [m for m in check.split(",") if m]
+    return {"import.break_reminder": result}
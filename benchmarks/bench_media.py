@@ -0,0 +1,115 @@
+import os
+import time
+import tempfile
+from typing import Dict
+
+from benchmarks.common import measure, summarize
+
+GIF_SIZE = (480, 360)
+GIF_FRAMES = 60
+VIDEO_SIZE = (1920, 1080)
+VIDEO_FRAMES = 90
+# 与 80% 屏幕大小的休息窗口相当的显示区域
+DISPLAY_AREA = (1536, 784)
+
+
+def make_gif(path: str):
+    """生成带渐变动画的合成 GIF"""
+    from PIL import Image, ImageDraw
+    frames = []
+    for i in range(GIF_FRAMES):
+        img = Image.new("RGB", GIF_SIZE, (i * 4 % 256, 80, 160))
+        draw = ImageDraw.Draw(img)
+        draw.ellipse((i * 6, 100, i * 6 + 80, 180), fill=(255, 220, 0))
+        frames.append(img)
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=40, loop=0)
+
+
+def make_video(path: str):
+    """生成 1080p 合成视频"""
+    import cv2
+    import numpy as np
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30, VIDEO_SIZE)
+    for i in range(VIDEO_FRAMES):
+        frame = np.full((VIDEO_SIZE[1], VIDEO_SIZE[0], 3), (i * 2 % 256, 90, 180), dtype=np.uint8)
+        cv2.circle(frame, (i * 20 % VIDEO_SIZE[0], 540), 120, (0, 220, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def bench_gif(root, label, work_dir: str) -> Dict[str, Dict]:
+    from src.gif_cache import GifFrameCache, GifPlayer
+
+    path = os.path.join(work_dir, "synthetic.gif")
+    make_gif(path)
+    results = {}
+
+    cache = GifFrameCache()
+    results["gif.decode_and_scale"] = measure(lambda: (cache.clear(), cache.get(path, DISPLAY_AREA)), 3)
+
+    player = GifPlayer(cache.get(path, DISPLAY_AREA))
+    samples = []
+    for i in range(GIF_FRAMES * 2):
+        start = time.perf_counter()
+        photo = player.photo(i % GIF_FRAMES)
+        label.configure(image=photo)
+        root.update_idletasks()
+        samples.append(time.perf_counter() - start)
+    results["gif.per_frame"] = summarize(samples)
+    return results
+
+
+def bench_video(root, label, work_dir: str) -> Dict[str, Dict]:
+    from PIL import ImageTk
+    from src.video_pipeline import VideoDecoder
+
+    path = os.path.join(work_dir, "synthetic.mp4")
+    make_video(path)
+    decoder = VideoDecoder(path)
+    decoder.fit_to(*DISPLAY_AREA)
+
+    # 解码线程单独产出一帧（读取、缩放、颜色转换）的耗时，用吞吐量折算
+    decoder.start()
+    frames = []
+    start = time.perf_counter()
+    while len(frames) < VIDEO_FRAMES:
+        item = decoder.get_frame()
+        if item is None:
+            time.sleep(0.001)
+            continue
+        frames.append(item[1])
+    decode_elapsed = time.perf_counter() - start
+    decoder.stop()
+
+    samples = []
+    for img in frames:
+        start = time.perf_counter()
+        photo = ImageTk.PhotoImage(image=img)
+        label.configure(image=photo)
+        label.image = photo
+        root.update_idletasks()
+        samples.append(time.perf_counter() - start)
+
+    return {
+        "video.decode_per_frame": {"runs": VIDEO_FRAMES, "mean_ms": decode_elapsed / VIDEO_FRAMES * 1000},
+        "video.display_per_frame": summarize(samples),
+    }
+
+
+def run() -> Dict[str, Dict]:
+    """
+    在合成媒体上测量 GIF 和视频每帧的开销
+    需要可用的显示（可用 Xvfb）
+    """
+    import tkinter as tk
+
+    root = tk.Tk()
+    label = tk.Label(root)
+    label.pack()
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            results = bench_gif(root, label, work_dir)
+            results.update(bench_video(root, label, work_dir))
+    finally:
+        root.destroy()
+    return results
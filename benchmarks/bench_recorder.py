@@ -0,0 +1,61 @@
+import os
+import json
+import tempfile
+from datetime import datetime, timedelta
+from typing import Dict
+
+from benchmarks.common import measure
+from src.focus_recorder import FocusRecorder
+
+DAY_SIZES = (10, 1000, 100000)
+
+
+def make_record(index: int) -> Dict:
+    start = datetime(2024, 1, 1, 8, 0) + timedelta(minutes=index)
+    return {
+        "focus_goal": f"目标 {index % 7}",
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(minutes=40)).isoformat(),
+        "duration_minutes": 40,
+        "notes": None,
+        "record_time": start.isoformat(),
+    }
+
+
+def populate_day(data_dir: str, backend: str, date: str, count: int):
+    """
+    生成一天的记录文件
+    :param data_dir: 数据目录
+    :param backend: json 或 jsonl
+    :param date: 日期
+    :param count: 记录数
+    """
+    records = (make_record(i) for i in range(count))
+    if backend == "json":
+        with open(os.path.join(data_dir, f"{date}.json"), "w", encoding="utf-8") as f:
+            json.dump(list(records), f, ensure_ascii=False, indent=2)
+    else:
+        with open(os.path.join(data_dir, f"{date}.jsonl"), "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def run(repeat: int = 20) -> Dict[str, Dict]:
+    """
+    测量不同大小的当天文件上 add_focus_record 的延迟
+    :param repeat: 每种规模写入的次数
+    """
+    results = {}
+    today = datetime.now().strftime("%Y-%m-%d")
+    for backend in ("jsonl", "json"):
+        for size in DAY_SIZES:
+            # 旧版整文件重写在十万条时单次就要数秒，少测几次
+            runs = repeat if backend == "jsonl" or size < 100000 else 3
+            with tempfile.TemporaryDirectory() as data_dir:
+                populate_day(data_dir, backend, today, size)
+                recorder = FocusRecorder(data_dir, backend=backend)
+                now = datetime.now()
+                results[f"add_focus_record.{backend}.{size}"] = measure(
+                    lambda: recorder.add_focus_record("基准测试", now, now, 40), runs
+                )
+    return results
@@ -0,0 +1,65 @@
+import os
+import time
+import tempfile
+from typing import Dict
+
+from benchmarks.bench_recorder import populate_day
+from benchmarks.common import measure, summarize
+
+HISTORY_SIZES = (100, 1000)
+
+
+def _create_app(ctk):
+    from src.break_reminder import BreakReminderApp
+    root = ctk.CTk()
+    start = time.perf_counter()
+    app = BreakReminderApp(root)
+    # 处理完所有待绘制的空闲任务即视为首次绘制完成
+    root.update()
+    return root, app, time.perf_counter() - start
+
+
+def _destroy_app(app):
+    # 与退出程序相同的清理（停止看门狗、音频、目录监视、指标和代理进程等），只是不退出进程
+    app.shutdown()
+
+
+def run(repeat: int = 5) -> Dict[str, Dict]:
+    """
+    测量 BreakReminderApp 的首次绘制时间和大数据量下 refresh_history 的耗时
+    需要可用的显示（可用 Xvfb）
+    :param repeat: 次数
+    """
+    import customtkinter as ctk
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        # 专注记录写在当前目录的 dirty 下，切到临时目录避免污染真实数据
+        os.chdir(work_dir)
+        try:
+            os.makedirs("dirty")
+            samples = []
+            for _ in range(repeat):
+                root, app, elapsed = _create_app(ctk)
+                samples.append(elapsed)
+                _destroy_app(app)
+            results["ui.first_paint"] = summarize(samples)
+
+            root, app, _ = _create_app(ctk)
+            try:
+                for size in HISTORY_SIZES:
+                    date = f"2000-01-{HISTORY_SIZES.index(size) + 1:02d}"
+                    populate_day("dirty", "jsonl", date, size)
+                    app.date_entry.delete(0, "end")
+                    app.date_entry.insert(0, date)
+
+                    def refresh():
+                        app.refresh_history()
+                        root.update()
+                    results[f"ui.refresh_history.{size}"] = measure(refresh, repeat)
+            finally:
+                _destroy_app(app)
+        finally:
+            os.chdir(cwd)
+    return results
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import shutil
+import statistics
+import subprocess
+from typing import Callable, Dict, List, Optional
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    把若干次耗时（秒）汇总为毫秒统计
+    :param samples: 每次的耗时
+    :return: 统计字典
+    """
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "runs": len(samples),
+        "min_ms": ordered[0] * 1000,
+        "median_ms": statistics.median(ordered) * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p95_ms": p95 * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def measure(func: Callable[[], None], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """
+    重复执行并计时
+    :param func: 被测函数
+    :param repeat: 次数
+    :param setup: 每次执行前调用、不计时的准备函数
+    :return: 统计字典
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+class VirtualDisplay:
+    """
+    没有可用显示时启动 Xvfb 虚拟显示，退出时关闭
+    已有 DISPLAY 或不是 Linux 时什么也不做
+    """
+
+    def __init__(self, display: str = ":99", screen: str = "1920x1080x24"):
+        self.display = display
+        self.screen = screen
+        self.process = None
+
+    def __enter__(self):
+        if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+            if shutil.which("Xvfb") is None:
+                raise RuntimeError("没有可用的显示，也找不到 Xvfb")
+            self.process = subprocess.Popen(
+                ["Xvfb", self.display, "-screen", "0", self.screen, "-nolisten", "tcp"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            os.environ["DISPLAY"] = self.display
+            # 等待 X 服务就绪
+            time.sleep(1.0)
+        return self
+
+    def __exit__(self, *exc):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(timeout=5)
+            os.environ.pop("DISPLAY", None)
+        return False
@@ -0,0 +1,64 @@
+import os
+import sys
+import json
+import argparse
+import platform
+import datetime
+import contextlib
+import traceback
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks import bench_import, bench_media, bench_recorder, bench_ui
+from benchmarks.common import VirtualDisplay
+
+SUITES = {
+    "import": lambda: bench_import.run(REPO_ROOT),
+    "recorder": bench_recorder.run,
+    "ui": bench_ui.run,
+    "media": bench_media.run,
+}
+# 需要显示的测试组，没有 DISPLAY 时自动启动 Xvfb
+DISPLAY_SUITES = {"ui", "media"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BreakReminder 基准测试")
+    parser.add_argument("--output", help="结果 JSON 文件路径，不指定则输出到标准输出")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES),
+                        help="只运行指定的测试组，可重复；默认全部")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": {},
+        "errors": {},
+    }
+
+    suites = args.suite or list(SUITES)
+    display = VirtualDisplay() if DISPLAY_SUITES.intersection(suites) else contextlib.nullcontext()
+    with display:
+        for name in suites:
+            print(f"运行 {name} ...", file=sys.stderr)
+            try:
+                report["results"].update(SUITES[name]())
+            except Exception:
+                report["errors"][name] = traceback.format_exc()
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    sys.exit(1 if report["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@ def create_debug_config():
     debug_config = {
         "debug": True,
         "log_file": "debug.log",
+        "log_max_bytes": 2 * 1024 * 1024,
+        "log_backup_count": 3,
         "config_path": "config.json"
     }
     with open("debug_config.json", "w", encoding="utf-8") as f:
@@ -50,6 +52,7 @@ def build_executable():
         '--hidden-import=pystray',  # 添加隐藏导入
         '--hidden-import=plyer',  # 添加隐藏导入
         '--hidden-import=cv2',  # 添加隐藏导入
+        '--hidden-import=src.video_pipeline',  # 按需加载的模块，静态分析找不到
         '--collect-all=customtkinter',  # 收集所有customtkinter相关文件
         '--collect-all=PIL',  # 收集所有PIL相关文件
         '--noconfirm',  # 不询问确认
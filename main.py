@@ -1,19 +1,35 @@
+from src.startup_profile import startup_profiler
+import multiprocessing
 import customtkinter as ctk
-from src.break_reminder import BreakReminderApp, setup_folders
+from src.break_reminder import BreakReminderApp, setup_folders, setup_logging
+
+startup_profiler.mark("导入模块")
 
 def main():
     """主函数"""
+    # 初始化日志；不在导入时进行，spawn 出的工作进程重新导入本模块时不会再打开一个日志写入者
+    setup_logging()
+    
     # 设置必要的文件夹
     setup_folders()
     
     # 创建根窗口
     root = ctk.CTk()
+    startup_profiler.mark("创建根窗口")
     
     # 创建应用实例
     app = BreakReminderApp(root)
     
+    # 首次绘制完成后写出启动耗时报告
+    def on_first_paint():
+        startup_profiler.mark("首次绘制")
+        startup_profiler.report()
+    root.after_idle(on_first_paint)
+    
     # 启动主循环
     root.mainloop()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    # 打包后的程序启动代理生成工作进程时需要
+    multiprocessing.freeze_support()
+    main()
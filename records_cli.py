@@ -0,0 +1,154 @@
+"""
+专注记录的批量导出 / 导入
+
+导出（流式，同一时间只有一天的记录在内存中）:
+    python records_cli.py export --start 2024-01-01 --end 2024-12-31 --format csv -o records.csv
+    python records_cli.py export --format ndjson > records.ndjson
+
+导入（每个日期文件只写一次）:
+    python records_cli.py import records.ndjson
+    python records_cli.py import records.csv --format csv
+"""
+import os
+import sys
+import csv
+import json
+import argparse
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.focus_recorder import FocusRecorder
+from src.focus_stats import FocusStats
+
+# 导出的列，date 为记录所在的日期文件
+FIELDS = ("date", "focus_goal", "start_time", "end_time", "duration_minutes", "notes", "record_time")
+
+# 程序的设置文件，与 break_reminder.py 在同一目录
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "config.json")
+BACKENDS = ("jsonl", "sqlite", "json")
+
+
+def configured_backend(config_path: str) -> Optional[str]:
+    """
+    读取程序设置中的存储后端，只读不改设置文件
+    :param config_path: config.json 路径
+    :return: 后端名，设置文件不存在、无法读取或没有设置时返回 None
+    """
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            backend = json.load(f).get("record_backend")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return backend if backend in BACKENDS else None
+
+
+def export_records(recorder: FocusRecorder, out, fmt: str, start_date=None, end_date=None) -> int:
+    """
+    把记录流式写出
+    :param recorder: 专注记录器
+    :param out: 文本输出流
+    :param fmt: csv 或 ndjson
+    :param start_date: 起始日期（含）
+    :param end_date: 结束日期（含）
+    :return: 写出的记录数
+    """
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for date, record in recorder.iter_records(start_date, end_date):
+            writer.writerow(dict(record, date=date))
+            count += 1
+    else:
+        for date, record in recorder.iter_records(start_date, end_date):
+            # 紧凑格式：不带多余空格，中文不转义
+            out.write(json.dumps(dict(record, date=date), ensure_ascii=False, separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+
+def read_records(source, fmt: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    逐条读取导入文件
+    :param source: 文本输入流
+    :param fmt: csv 或 ndjson
+    :return: (日期, 记录) 迭代器
+    """
+    if fmt == "csv":
+        rows = csv.DictReader(source)
+    else:
+        rows = (json.loads(line) for line in source if line.strip())
+    for row in rows:
+        # 没有 date 列时按开始时间所在的日期归档
+        date = row.pop("date", None) or row["start_time"][:10]
+        yield date, {
+            "focus_goal": row.get("focus_goal"),
+            "start_time": row.get("start_time"),
+            "end_time": row.get("end_time"),
+            "duration_minutes": int(row.get("duration_minutes") or 0),
+            "notes": row.get("notes") or None,
+            "record_time": row.get("record_time") or row.get("end_time"),
+        }
+
+
+def import_records(recorder: FocusRecorder, source, fmt: str) -> int:
+    """
+    批量导入记录，同一日期的连续记录合并为一次写入
+    按日期排序的输入（如 export 的输出）每个日期文件只写一次
+    :param recorder: 专注记录器
+    :param source: 文本输入流
+    :param fmt: csv 或 ndjson
+    :return: 导入的记录数
+    """
+    count = 0
+    batch_date, batch = None, []
+    for date, record in read_records(source, fmt):
+        if date != batch_date:
+            recorder.import_records(batch_date, batch)
+            batch_date, batch = date, []
+        batch.append(record)
+        count += 1
+    recorder.import_records(batch_date, batch)
+    # 导入绕过了增量统计，下次启动时重新计算
+    FocusStats.invalidate(recorder.data_dir)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="专注记录批量导出 / 导入")
+    parser.add_argument("--data-dir", default="dirty", help="记录目录")
+    parser.add_argument("--backend", choices=BACKENDS, help="存储后端，默认与程序设置中的 record_backend 相同")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="程序设置文件，用于确定默认的存储后端")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="导出记录")
+    export_parser.add_argument("--start", help="起始日期 YYYY-MM-DD（含）")
+    export_parser.add_argument("--end", help="结束日期 YYYY-MM-DD（含）")
+    export_parser.add_argument("--format", choices=("csv", "ndjson"), default="ndjson")
+    export_parser.add_argument("-o", "--output", help="输出文件，默认标准输出")
+
+    import_parser = subparsers.add_parser("import", help="导入记录")
+    import_parser.add_argument("input", help="输入文件，- 表示标准输入")
+    import_parser.add_argument("--format", choices=("csv", "ndjson"), default="ndjson")
+
+    args = parser.parse_args(argv)
+    backend = args.backend or configured_backend(args.config) or "jsonl"
+    recorder = FocusRecorder(args.data_dir, backend=backend)
+
+    if args.command == "export":
+        if args.output:
+            with open(args.output, "w", encoding="utf-8", newline="") as out:
+                count = export_records(recorder, out, args.format, args.start, args.end)
+        else:
+            count = export_records(recorder, sys.stdout, args.format, args.start, args.end)
+        print(f"已导出 {count} 条记录", file=sys.stderr)
+    else:
+        if args.input == "-":
+            count = import_records(recorder, sys.stdin, args.format)
+        else:
+            with open(args.input, "r", encoding="utf-8", newline="") as source:
+                count = import_records(recorder, source, args.format)
+        print(f"已导入 {count} 条记录", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import os
+import queue
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from src.lazy_modules import get_mixer
+
+
+class AudioEngine:
+    """
+    音频子系统，所有 pygame 音频调用都在专用线程中执行，Tk 线程只投递命令
+    两个互不干扰的通道：
+    提示音：短音效解码为 Sound 后缓存在内存，在保留的独立声道上播放，重复提醒不再读盘；
+    背景音乐：pygame.mixer.music 边读盘边解码，不会整体载入内存，由 SDL_mixer 无缝循环，支持淡入淡出
+    """
+
+    # 最多缓存的提示音数量
+    MAX_CUES = 8
+
+    def __init__(self):
+        self._commands = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._cues: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cue_channel = None
+        self.music_path: Optional[str] = None
+
+    def _submit(self, func, *args):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="AudioEngine", daemon=True)
+                self._thread.start()
+        self._commands.put((func, args))
+
+    def _run(self):
+        while True:
+            func, args = self._commands.get()
+            if func is None:
+                break
+            try:
+                func(*args)
+            except Exception as e:
+                logging.error(f"音频命令 {func.__name__} 执行失败: {str(e)}")
+
+    # ---- 提示音 ----
+
+    def _ensure_cue_channel(self, mixer):
+        if self._cue_channel is None:
+            # 保留 0 号声道给提示音，普通 Sound 播放不会占用它
+            mixer.set_reserved(1)
+            self._cue_channel = mixer.Channel(0)
+        return self._cue_channel
+
+    def _get_cue(self, path: str):
+        """取得解码好的提示音，文件改变后重新解码"""
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._cues.get(path)
+        if cached is not None and cached[0] == signature:
+            self._cues.move_to_end(path)
+            return cached[1]
+        sound = get_mixer().Sound(path)
+        self._cues[path] = (signature, sound)
+        while len(self._cues) > self.MAX_CUES:
+            self._cues.popitem(last=False)
+        logging.info(f"已缓存提示音: {path}, {sound.get_length():.1f} 秒")
+        return sound
+
+    def preload_cue(self, path: str):
+        """
+        在音频线程中预先解码提示音
+        :param path: 音频文件路径
+        """
+        self._submit(self._do_preload_cue, path)
+
+    def _do_preload_cue(self, path: str):
+        if os.path.exists(path):
+            self._get_cue(path)
+
+    def play_cue(self, path: str):
+        """
+        播放提示音，不影响正在播放的背景音乐
+        :param path: 音频文件路径
+        """
+        self._submit(self._do_play_cue, path)
+
+    def _do_play_cue(self, path: str):
+        sound = self._get_cue(path)
+        self._ensure_cue_channel(get_mixer()).play(sound)
+
+    # ---- 背景音乐 ----
+
+    def play_music(self, path: str, loop: bool = True, fade_ms: int = 0):
+        """
+        从磁盘流式播放背景音乐，替换当前的背景音乐
+        :param path: 音频文件路径
+        :param loop: 是否无缝循环
+        :param fade_ms: 淡入时长（毫秒）
+        """
+        self._submit(self._do_play_music, path, loop, fade_ms)
+
+    def _do_play_music(self, path: str, loop: bool, fade_ms: int):
+        music = get_mixer().music
+        music.stop()
+        music.load(path)
+        music.play(-1 if loop else 0, fade_ms=fade_ms)
+        self.music_path = path
+
+    def stop_music(self, fade_ms: int = 0):
+        """
+        停止背景音乐
+        :param fade_ms: 淡出时长（毫秒），0 表示立即停止
+        """
+        self._submit(self._do_stop_music, fade_ms)
+
+    def _do_stop_music(self, fade_ms: int):
+        if self.music_path is None:
+            return
+        music = get_mixer().music
+        if fade_ms > 0 and music.get_busy():
+            # fadeout 会阻塞到淡出结束，正好在音频线程中执行
+            music.fadeout(fade_ms)
+        else:
+            music.stop()
+        music.unload()
+        self.music_path = None
+
+    def pause_music(self):
+        """暂停背景音乐"""
+        self._submit(lambda: self.music_path and get_mixer().music.pause())
+
+    def resume_music(self):
+        """继续播放背景音乐"""
+        self._submit(lambda: self.music_path and get_mixer().music.unpause())
+
+    def shutdown(self, timeout: float = 2.0):
+        """
+        停止所有声音并结束音频线程
+        :param timeout: 最多等待的秒数
+        """
+        with self._lock:
+            thread = self._thread
+        if thread is None:
+            return
+        self._submit(self._do_stop_music, 0)
+        self._commands.put((None, ()))
+        thread.join(timeout)
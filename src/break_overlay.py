@@ -0,0 +1,247 @@
+"""
+多显示器休息窗口
+枚举所有显示器（Windows 用 EnumDisplayMonitors，Linux 用 xrandr，其余情况退回 Tk 的屏幕尺寸），
+每个显示器打开一个休息窗口；媒体只按共同的显示区域解码、转换一次，
+同一个 PhotoImage 同时显示在所有窗口的标签上，显示器再多也不增加解码开销
+"""
+import re
+import sys
+import shutil
+import logging
+import threading
+import subprocess
+import tkinter as tk
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+
+class Monitor(NamedTuple):
+    """一个显示器在虚拟桌面上的位置和大小（像素）"""
+    x: int
+    y: int
+    width: int
+    height: int
+    primary: bool = False
+
+
+def _windows_monitors() -> List[Monitor]:
+    import ctypes
+    from ctypes import wintypes
+
+    class MONITORINFO(ctypes.Structure):
+        _fields_ = [("cbSize", wintypes.DWORD), ("rcMonitor", wintypes.RECT),
+                    ("rcWork", wintypes.RECT), ("dwFlags", wintypes.DWORD)]
+
+    MONITORINFOF_PRIMARY = 1
+    user32 = ctypes.windll.user32
+    monitors = []
+
+    def callback(hmonitor, hdc, rect, data):
+        info = MONITORINFO()
+        info.cbSize = ctypes.sizeof(MONITORINFO)
+        if user32.GetMonitorInfoW(hmonitor, ctypes.byref(info)):
+            r = info.rcMonitor
+            monitors.append(Monitor(r.left, r.top, r.right - r.left, r.bottom - r.top,
+                                    bool(info.dwFlags & MONITORINFOF_PRIMARY)))
+        return 1
+
+    enum_proc = ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HMONITOR, wintypes.HDC,
+                                   ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
+    user32.EnumDisplayMonitors(None, None, enum_proc(callback), 0)
+    return monitors
+
+
+# 例如 "HDMI-1 connected primary 1920x1080+0+0 (normal left inverted ...) 527mm x 296mm"
+XRANDR_PATTERN = re.compile(r"^\S+ connected (primary )?(\d+)x(\d+)\+(-?\d+)\+(-?\d+)", re.MULTILINE)
+
+
+def _xrandr_monitors() -> List[Monitor]:
+    xrandr = shutil.which("xrandr")
+    if xrandr is None:
+        return []
+    result = subprocess.run([xrandr, "--query"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=2)
+    if result.returncode != 0:
+        return []
+    return [Monitor(int(x), int(y), int(width), int(height), bool(primary))
+            for primary, width, height, x, y in XRANDR_PATTERN.findall(result.stdout.decode("utf-8", "replace"))]
+
+
+def enumerate_monitors(screen_size: Tuple[int, int]) -> List[Monitor]:
+    """
+    列出所有显示器，主显示器排在第一个；可能要运行 xrandr，不要在 Tk 线程中调用
+    :param screen_size: Tk 报告的屏幕尺寸，无法枚举时当作唯一的显示器
+    :return: 显示器列表，至少包含一个
+    """
+    monitors = []
+    try:
+        if sys.platform == "win32":
+            monitors = _windows_monitors()
+        elif sys.platform.startswith("linux"):
+            monitors = _xrandr_monitors()
+    except Exception as e:
+        logging.warning(f"枚举显示器失败，只使用主屏幕: {str(e)}")
+        monitors = []
+    if not monitors:
+        return [Monitor(0, 0, screen_size[0], screen_size[1], True)]
+    if not any(monitor.primary for monitor in monitors):
+        monitors[0] = monitors[0]._replace(primary=True)
+    return sorted(monitors, key=lambda monitor: not monitor.primary)
+
+
+class MonitorLayout:
+    """
+    显示器布局的缓存：在后台线程中枚举，Tk 线程只读取缓存的结果
+    首次枚举完成前使用 Tk 报告的屏幕尺寸
+    """
+
+    def __init__(self, root):
+        """
+        必须在 Tk 线程中创建
+        :param root: Tk 根窗口
+        """
+        self.root = root
+        self.monitors: List[Monitor] = [Monitor(0, 0, root.winfo_screenwidth(), root.winfo_screenheight(), True)]
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def refresh(self):
+        """在后台重新枚举显示器，已在枚举时不重复启动；必须在 Tk 线程中调用"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        screen_size = (self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+        threading.Thread(target=self._enumerate, args=(screen_size,), name="MonitorLayout", daemon=True).start()
+
+    def _enumerate(self, screen_size: Tuple[int, int]):
+        try:
+            monitors = enumerate_monitors(screen_size)
+            if monitors != self.monitors:
+                logging.info(f"显示器布局: {monitors}")
+            self.monitors = monitors
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+def overlay_geometry(monitor: Monitor, scale: float = 0.8, button_area: int = 80) -> Tuple[Tuple[int, int], str]:
+    """
+    计算某个显示器上休息窗口的位置大小：显示器的 scale 倍并居中
+    :param monitor: 显示器
+    :param scale: 窗口占显示器的比例
+    :param button_area: 底部为结束按钮保留的高度
+    :return: (媒体显示区域 (宽, 高), Tk geometry 字符串)
+    """
+    width = int(monitor.width * scale)
+    height = int(monitor.height * scale)
+    x = monitor.x + (monitor.width - width) // 2
+    y = monitor.y + (monitor.height - height) // 2
+    return (width, height - button_area), f"{width}x{height}+{x}+{y}"
+
+
+def shared_area(monitors: List[Monitor], scale: float = 0.8, button_area: int = 80) -> Tuple[int, int]:
+    """
+    所有休息窗口共同的媒体显示区域，媒体按这个尺寸解码一次后在每个窗口中显示
+    :param monitors: 显示器列表
+    :param scale: 窗口占显示器的比例
+    :param button_area: 底部为结束按钮保留的高度
+    :return: (宽, 高)
+    """
+    areas = [overlay_geometry(monitor, scale, button_area)[0] for monitor in monitors]
+    return min(area[0] for area in areas), min(area[1] for area in areas)
+
+
+class MirroredLabel:
+    """一组显示相同内容的标签，每个休息窗口一个；配置一次即应用到全部"""
+
+    def __init__(self, labels: List[tk.Label]):
+        """
+        :param labels: 各窗口中的标签，第一个在主显示器上
+        """
+        self.labels = labels
+        # 保持当前图像的引用，所有标签共用
+        self.image = None
+        self._sizes: Dict[tk.Label, Tuple[int, int]] = {}
+
+    def configure(self, **kwargs):
+        for label in self.labels:
+            label.configure(**kwargs)
+
+    def pack(self, **kwargs):
+        for label in self.labels:
+            label.pack(**kwargs)
+
+    def destroy(self):
+        for label in self.labels:
+            label.destroy()
+
+    def on_resize(self, callback: Callable[[int, int], None]):
+        """
+        任一标签大小变化时以所有标签中最小的宽、高调用 callback，保证共用的帧放得进每个窗口
+        :param callback: callback(宽, 高)
+        """
+        def on_configure(event):
+            self._sizes[event.widget] = (event.width, event.height)
+            callback(min(size[0] for size in self._sizes.values()),
+                     min(size[1] for size in self._sizes.values()))
+
+        for label in self.labels:
+            label.bind("<Configure>", on_configure)
+
+
+class BreakOverlays:
+    """每个显示器一个休息窗口"""
+
+    def __init__(self, root, monitors: List[Monitor], scale: float = 0.8, button_area: int = 80):
+        """
+        :param root: Tk 根窗口
+        :param monitors: 显示器列表，主显示器在第一个
+        :param scale: 窗口占显示器的比例
+        :param button_area: 底部为结束按钮保留的高度
+        """
+        self.root = root
+        self.monitors = monitors
+        self.scale = scale
+        self.button_area = button_area
+        self.area = shared_area(monitors, scale, button_area)
+        self.windows: List[tk.Toplevel] = []
+
+    @property
+    def primary(self) -> tk.Toplevel:
+        """主显示器上的窗口，播放控制和定时任务放在这里"""
+        return self.windows[0]
+
+    def open(self, title: str, on_close: Callable[[], None]):
+        """
+        在每个显示器上创建置顶的休息窗口
+        :param title: 窗口标题
+        :param on_close: 用户尝试关闭窗口时调用
+        """
+        for monitor in self.monitors:
+            window = tk.Toplevel(self.root)
+            window.title(title)
+            window.attributes('-topmost', True)
+            window.protocol("WM_DELETE_WINDOW", on_close)
+            window.geometry(overlay_geometry(monitor, self.scale, self.button_area)[1])
+            self.windows.append(window)
+        logging.info(f"已在 {len(self.windows)} 个显示器上打开休息窗口，媒体区域 {self.area}")
+
+    def label(self, parents: List = None, **kwargs) -> MirroredLabel:
+        """
+        在每个窗口中创建一个标签
+        :param parents: 各窗口中的父控件，默认为窗口本身
+        :return: 同步显示的标签组
+        """
+        return MirroredLabel([tk.Label(parent, **kwargs) for parent in (parents or self.windows)])
+
+    def raise_all(self):
+        """把所有窗口提到最前，焦点给主显示器上的窗口"""
+        for window in self.windows:
+            window.lift()
+        self.primary.focus_force()
+
+    def close(self):
+        """关闭所有窗口"""
+        for window in self.windows:
+            if window.winfo_exists():
+                window.destroy()
+        self.windows = []
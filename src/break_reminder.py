@@ -1,20 +1,30 @@
 import os
 import sys
 import time
-import json
 import threading
 import datetime
 import logging
 import tkinter as tk
 from tkinter import messagebox, filedialog
 import customtkinter as ctk
-from PIL import Image, ImageTk, ImageSequence
-import pygame
-import pystray
-from pystray import MenuItem as item
-from plyer import notification
-import cv2
+from PIL import Image, ImageTk
+from src.break_overlay import BreakOverlays, MonitorLayout, shared_area
+from src.config_store import ConfigStore, ConfigError
 from src.focus_recorder import FocusRecorder
+from src.focus_stats import FocusStats
+from src.gif_cache import GifFrameCache, GifPlayer, decode_gif
+from src.history_view import VirtualHistoryList
+from src.media_ingest import MediaIngest
+from src.media_catalog import ROTATION_MODES, MediaRotation, create_rotation, peek_from, pick_from
+from src.media_prefetch import MediaPrefetcher
+from src.proxy_cache import ProxyCache, GIF, VIDEO
+from src.scheduler import BreakScheduler, IDLE, BREAK
+from src.audio_engine import AudioEngine
+from src.lazy_modules import get_video_pipeline, notify
+from src.startup_profile import startup_profiler
+from src import log_pipeline
+from src.metrics import metrics
+from src.stall_watchdog import StallWatchdog
 
 # 设置日志
 def setup_logging():
@@ -25,31 +35,20 @@ def setup_logging():
         else:
             application_path = os.path.dirname(os.path.abspath(__file__))
         
-        # 创建日志文件路径
-        log_file = os.path.join(application_path, 'debug.log')
-        
-        # 配置日志
-        logging.basicConfig(
-            filename=log_file,
-            level=logging.DEBUG,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
-        logging.info(f"程序启动，运行路径: {application_path}")
+        # 配置日志：后台线程写入轮转文件，级别来自 debug_config.json
+        debug_config = log_pipeline.setup_logging(application_path)
+        logging.info(f"程序启动，运行路径: {application_path}, 日志级别: "
+                     f"{logging.getLevelName(logging.getLogger().level)}, 调试配置: {debug_config}")
     except Exception as e:
         print(f"设置日志失败: {str(e)}")
 
-# 初始化日志
-setup_logging()
-
-# 初始化pygame用于播放提醒音效
-pygame.mixer.init()
-
 # 默认配置
 DEFAULT_CONFIG = {
     "work_time": 40,  # work time (minutes)
     "break_time": 10,  # break time (minutes)
     "animation_folder": "animations",  # animation folder
-    "animation_speed": 100,  # animation speed (milliseconds)
+    "animation_speed": 100,  # default frame time when the GIF does not specify one (milliseconds)
+    "animation_speed_scale": 1.0,  # GIF playback speed multiplier
     "sound_enabled": True,  # whether to enable sound
     "sound_file": "sounds/test.mp3",  # sound file path
     "auto_start": False,  # whether to auto start
@@ -57,10 +56,55 @@ DEFAULT_CONFIG = {
     "show_notifications": True,  # whether to show notifications
     "media_type": "gif",  # 媒体类型: gif, video, music, none
     "video_file": "videos/sample.mp4",  # 视频文件路径
-    "music_file": "sounds/test.mp3"  # 音乐文件路径
+    "music_file": "sounds/test.mp3",  # 音乐文件路径
+    "record_backend": "jsonl",  # 专注记录存储后端: jsonl, sqlite, json
+    "record_write_behind": False,  # 缓冲专注记录并定时批量写入
+    "record_flush_seconds": 5,  # 写缓冲的刷新间隔 (秒)
+    "gif_cache_mb": 64,  # GIF帧缓存上限 (MB)
+    "prefetch_seconds": 15,  # 休息开始前多少秒预加载媒体，0 表示不预加载
+    "metrics_file": "",  # 定期写入运行指标的 JSON 文件，留空表示不写
+    "metrics_dump_seconds": 60,  # 写入运行指标的间隔 (秒)
+    "metrics_port": 0,  # 在 127.0.0.1 的该端口上提供运行指标，0 表示不开启
+    "watchdog_threshold_ms": 500,  # 主线程卡顿超过该时长时记录调用栈，0 表示关闭
+    "music_fade_ms": 1500,  # 休息开始/结束时背景音乐淡入淡出的时长 (毫秒)
+    "use_media_proxies": True,  # 在后台为大视频/GIF生成显示尺寸的代理文件
+    "proxy_cache_mb": 1024,  # 代理文件缓存上限 (MB)
+    "animation_rotation": "first",  # 动画轮换方式: first, shuffle, round_robin, weighted
+    "animation_weights": {},  # weighted 轮换时 文件名 -> 权重，未列出的为 1
+    "overlay_all_monitors": True  # 在每个显示器上都显示休息窗口
+}
+
+# 类型之外的取值校验
+CONFIG_VALIDATORS = {
+    "work_time": lambda v: v > 0,
+    "break_time": lambda v: v > 0,
+    "animation_speed": lambda v: v > 0,
+    "animation_speed_scale": lambda v: v > 0,
+    "media_type": lambda v: v in ("gif", "video", "music", "none"),
+    "record_backend": lambda v: v in ("jsonl", "sqlite", "json"),
+    "record_flush_seconds": lambda v: v > 0,
+    "gif_cache_mb": lambda v: v > 0,
+    "prefetch_seconds": lambda v: v >= 0,
+    "metrics_dump_seconds": lambda v: v > 0,
+    "metrics_port": lambda v: 0 <= v <= 65535,
+    "watchdog_threshold_ms": lambda v: v >= 0,
+    "music_fade_ms": lambda v: v >= 0,
+    "proxy_cache_mb": lambda v: v > 0,
+    "animation_rotation": lambda v: v in ROTATION_MODES,
+    # 文件名 -> 非负的有限数字（不接受布尔值）
+    "animation_weights": lambda v: isinstance(v, dict) and all(
+        isinstance(name, str) and isinstance(weight, (int, float)) and not isinstance(weight, bool)
+        and 0 <= weight < float("inf") for name, weight in v.items()),
 }
 
+# 修改后需要让预加载的休息媒体失效的配置项
+MEDIA_CONFIG_KEYS = ("media_type", "animation_folder", "video_file", "music_file", "sound_enabled", "sound_file",
+                     "animation_rotation", "animation_weights")
+
 class BreakReminderApp:
+    # 休息窗口底部为结束按钮保留的高度（像素）
+    ANIMATION_BUTTON_AREA = 80
+    
     def __init__(self, root):
         self.root = root
         self.root.title("休息提醒")
@@ -72,28 +116,95 @@ class BreakReminderApp:
         ctk.set_default_color_theme("blue")
         
         # load config
-        self.config = self.load_config()
+        self.config_store = ConfigStore(
+            os.path.join(self.get_application_path(), "config.json"), DEFAULT_CONFIG, CONFIG_VALIDATORS
+        )
+        self.config = self.config_store.load()
+        startup_profiler.mark("加载配置")
         
         # initialize variables
         self.timer_running = False
-        self.work_timer = None
-        self.break_timer = None
+        self.countdown_timer = None
         self.remaining_work_time = self.config["work_time"] * 60
         self.remaining_break_time = self.config["break_time"] * 60
         self.is_break_time = False
         self.animation_window = None
+        self.overlays = None
+        # 显示器在后台枚举，Tk 线程只读缓存
+        self.monitor_layout = MonitorLayout(self.root)
+        self.monitor_layout.refresh()
+        self.monitors = self.current_monitors()
+        self.video_decoder = None
+        self.video_pacer = None
+        
+        # 显示尺寸的视频/GIF代理，由后台工作进程生成
+        self.proxy_cache = None
+        if self.config["use_media_proxies"]:
+            self.proxy_cache = ProxyCache(max_bytes=self.config["proxy_cache_mb"] * 1024 * 1024)
+        
+        # GIF帧缓存，多次休息之间共享；有代理时读取代理而不是原始 GIF
+        gif_decoder = self.proxy_cache.decode_gif if self.proxy_cache else decode_gif
+        self.gif_cache = GifFrameCache(self.config.get("gif_cache_mb", 64) * 1024 * 1024, gif_decoder)
+        
+        # 音频在专用线程中播放：提示音与背景音乐分开两个通道
+        self.audio_engine = AudioEngine()
+        
+        # 视频导入缓存：提取好的音轨和视频元数据
+        self.media_ingest = MediaIngest()
+        # 界面显示之后再开始导入和生成代理
+        self.root.after_idle(self.prepare_configured_media)
+        
+        # 动画文件夹的索引与轮换，选取时不扫描文件夹
+        self.animation_rotation = self.create_animation_rotation()
+        
+        # 休息前在后台预加载媒体
+        self.media_prefetcher = MediaPrefetcher(self.gif_cache, self.audio_engine, self.media_ingest, self.proxy_cache,
+                                                self.peek_break_animation)
+        self.prepared_media = None
+        
+        # 与界面无关的工作/休息状态机，界面通过事件订阅它
+        self.scheduler = BreakScheduler(self.remaining_work_time, self.remaining_break_time)
+        self.scheduler.subscribe("tick", self.on_timer_tick)
+        self.scheduler.subscribe("state_changed", self.on_timer_state_changed)
+        self.scheduler.subscribe("break_started", self.on_break_started)
+        self.scheduler.subscribe("break_ended", self.on_break_ended)
         
         # 初始化专注记录器
-        self.focus_recorder = FocusRecorder()
+        self.focus_recorder = FocusRecorder(
+            backend=self.config.get("record_backend", "jsonl"),
+            write_behind=self.config.get("record_write_behind", False),
+            flush_interval=self.config.get("record_flush_seconds", 5)
+        )
+        # 按天/周/月预先汇总的统计，随新增记录增量更新
+        self.focus_stats = FocusStats(self.focus_recorder)
         self.focus_start_time = None
         self.current_focus_goal = None
+        startup_profiler.mark("初始化专注记录器")
+        
+        # 运行指标：计数器和直方图，可写入文件或通过本机端口读取
+        self.metrics = metrics
+        self._tick_due = None
+        if self.config["metrics_file"]:
+            self.metrics.start_dumping(
+                os.path.join(self.get_application_path(), self.config["metrics_file"]),
+                self.config["metrics_dump_seconds"]
+            )
+        if self.config["metrics_port"]:
+            self.metrics.serve(self.config["metrics_port"])
         
-        # create icon for tray
-        self.icon_image = Image.open("images/icon.png") if os.path.exists("images/icon.png") else self.create_default_icon()
-        self.create_system_tray()
+        # 主线程卡顿看门狗：卡顿时把 Tk 线程的调用栈写入日志，并记入 mainloop.stall_ms
+        self.stall_watchdog = None
+        if self.config["watchdog_threshold_ms"]:
+            self.stall_watchdog = StallWatchdog(self.root, self.config["watchdog_threshold_ms"] / 1000)
+            self.stall_watchdog.start()
         
         # create UI
         self.create_ui()
+        startup_profiler.mark("创建界面")
+        
+        # 托盘图标在界面显示之后再创建
+        self.tray_icon = None
+        self.root.after_idle(self.create_system_tray)
         
         # 监听窗口关闭事件
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
@@ -111,6 +222,13 @@ class BreakReminderApp:
     
     def create_system_tray(self):
         """创建系统托盘图标"""
+        # create icon for tray
+        self.icon_image = Image.open("images/icon.png") if os.path.exists("images/icon.png") else self.create_default_icon()
+        
+        # pystray 在界面显示之后才导入
+        import pystray
+        from pystray import MenuItem as item
+        
         menu = (
             item('显示', self.show_window),
             item('开始/暂停', self.toggle_timer),
@@ -118,6 +236,7 @@ class BreakReminderApp:
         )
         self.tray_icon = pystray.Icon("break_reminder", self.icon_image, "休息提醒", menu)
         threading.Thread(target=self.tray_icon.run, daemon=True).start()
+        startup_profiler.mark("创建托盘图标")
     
     def create_ui(self):
         """创建用户界面"""
@@ -308,109 +427,135 @@ class BreakReminderApp:
         refresh_btn = ctk.CTkButton(date_frame, text="刷新", width=60, command=self.refresh_history)
         refresh_btn.pack(side="right", padx=5)
         
-        # 创建记录显示区域
-        self.history_frame = ctk.CTkScrollableFrame(history_tab)
+        # 统计汇总面板
+        summary_frame = ctk.CTkFrame(history_tab)
+        summary_frame.pack(fill="x", padx=10, pady=5)
+        
+        self.summary_labels = {}
+        for key, title in (("day", "当日"), ("week", "本周"), ("month", "本月")):
+            label = ctk.CTkLabel(summary_frame, text=f"{title}: -", anchor="w")
+            label.pack(fill="x", padx=5)
+            self.summary_labels[key] = label
+        self.summary_goals_label = ctk.CTkLabel(summary_frame, text="", anchor="w", justify="left")
+        self.summary_goals_label.pack(fill="x", padx=5, pady=(0, 5))
+        
+        # 创建记录显示区域，只为可见行创建控件
+        self.history_frame = VirtualHistoryList(history_tab)
         self.history_frame.pack(fill="both", expand=True, padx=10, pady=5)
         
         # 初始化显示今天的记录
         self.refresh_history()
+        
+        # 新增记录后更新统计面板
+        self.focus_recorder.subscribe(lambda date, record: self.refresh_summary())
+        
+        # 设置修改后只更新受影响的部分
+        self.config_store.subscribe(self.on_durations_changed, keys=("work_time", "break_time"))
+        self.config_store.subscribe(self.on_media_config_changed, keys=MEDIA_CONFIG_KEYS)
     
     def toggle_timer(self):
         """开始或暂停计时器"""
-        if self.timer_running:
+        if self.scheduler.running:
             self.pause_timer()
         else:
             self.start_timer()
     
     def start_timer(self):
         """开始计时器"""
-        if not self.timer_running:
-            self.timer_running = True
-            self.start_button.configure(text="暂停")
-            self.status_label.configure(text="工作中...")
-            
-            # 记录专注开始时间
+        if self.scheduler.running:
+            return
+        
+        # 从空闲开始新一轮工作时记录专注开始时间，暂停后继续则沿用
+        if self.scheduler.phase == IDLE:
             self.focus_start_time = datetime.datetime.now()
             self.current_focus_goal = self.focus_goal_entry.get() or "未设置目标"
-            
-            self.work_countdown()
+        
+        self.scheduler.start()
+        self.countdown_tick()
     
     def pause_timer(self):
         """暂停计时器"""
-        self.timer_running = False
-        self.start_button.configure(text="开始")
-        self.status_label.configure(text="已暂停")
-        
-        # 取消计时器
-        if self.work_timer:
-            self.root.after_cancel(self.work_timer)
-            self.work_timer = None
-        if self.break_timer:
-            self.root.after_cancel(self.break_timer)
-            self.break_timer = None
+        self.scheduler.pause()
+        self.cancel_countdown()
+    
+    def cancel_countdown(self):
+        """取消已安排的倒计时刷新"""
+        if self.countdown_timer:
+            self.root.after_cancel(self.countdown_timer)
+            self.countdown_timer = None
+        self._tick_due = None
     
     def reset_timer(self):
         """重置计时器"""
-        self.pause_timer()
-        self.is_break_time = False
+        self.cancel_countdown()
+        self.scheduler.reset(self.config["work_time"] * 60, self.config["break_time"] * 60)
         self.remaining_work_time = self.config["work_time"] * 60
         self.remaining_break_time = self.config["break_time"] * 60
+        self.focus_start_time = None
+        self.current_focus_goal = None
         self.time_label.configure(text=self.format_time(self.remaining_work_time))
         self.progress_bar.set(0)
-        self.status_label.configure(text="准备就绪")
-        self.start_button.configure(text="开始")
         
-        # 关闭动画窗口如果存在
-        if self.animation_window and self.animation_window.winfo_exists():
-            self.animation_window.destroy()
-            self.animation_window = None
+        # 丢弃未用的预加载媒体，停止视频解码，关闭动画窗口如果存在
+        self.media_prefetcher.cancel()
+        self.release_prepared_media()
+        self.stop_video()
+        self.close_animation_window()
     
-    def work_countdown(self):
-        """工作时间倒计时"""
-        if not self.timer_running:
-            return
-            
-        if self.remaining_work_time <= 0:
-            # 使用after_idle确保在主线程中执行
-            self.root.after_idle(self.start_break)
-            return
-            
-        self.remaining_work_time -= 1
-        self.time_label.configure(text=self.format_time(self.remaining_work_time))
-        
-        # 更新进度条
-        progress = 1 - (self.remaining_work_time / (self.config["work_time"] * 60))
-        self.progress_bar.set(progress)
-        
-        # 继续倒计时，使用after_idle确保在主线程中执行
-        self.work_timer = self.root.after(1000, self.work_countdown)
+    def countdown_tick(self):
+        """推进调度器，并把下一次刷新安排在下一个整秒边界上"""
+        self.countdown_timer = None
+        now = time.perf_counter()
+        if self._tick_due is not None:
+            # 实际执行比预定时间晚了多少
+            name = "break_countdown" if self.scheduler.is_break else "work_countdown"
+            self.metrics.observe(f"{name}.tick_lateness_ms", max(0.0, (now - self._tick_due) * 1000))
+            self._tick_due = None
+        delay = self.scheduler.poll()
+        if delay is not None and self.countdown_timer is None:
+            self._tick_due = now + delay / 1000
+            self.countdown_timer = self.root.after(delay, self.countdown_tick)
     
-    def break_countdown(self):
-        """休息时间倒计时"""
-        if not self.timer_running:
-            return
-            
-        if self.remaining_break_time <= 0:
-            # 使用after_idle确保在主线程中执行
-            self.root.after_idle(self.end_break)
-            return
-            
-        self.remaining_break_time -= 1
-        self.time_label.configure(text=self.format_time(self.remaining_break_time))
-        
-        # 更新进度条
-        progress = 1 - (self.remaining_break_time / (self.config["break_time"] * 60))
+    def on_timer_tick(self, phase, remaining, progress):
+        """调度器 tick 事件：刷新时间和进度条，临近休息时开始预加载媒体"""
+        if phase == BREAK:
+            self.remaining_break_time = remaining
+        else:
+            self.remaining_work_time = remaining
+            prefetch_seconds = self.config.get("prefetch_seconds", 15)
+            if 0 < remaining <= prefetch_seconds and not self.media_prefetcher.pending:
+                self.media_prefetcher.prefetch(self.config, self.break_area())
+                # 休息前再确认一次显示器布局
+                self.monitor_layout.refresh()
+        self.time_label.configure(text=self.format_time(remaining))
         self.progress_bar.set(progress)
-        
-        # 继续倒计时，使用after_idle确保在主线程中执行
-        self.break_timer = self.root.after(1000, self.break_countdown)
+    
+    def on_timer_state_changed(self, phase, running):
+        """调度器状态变化事件：刷新按钮和状态文字"""
+        self.is_break_time = phase == BREAK
+        self.timer_running = running
+        if phase == IDLE:
+            status = "准备就绪"
+        elif not running:
+            status = "已暂停"
+        elif phase == BREAK:
+            status = "休息时间！"
+        else:
+            status = "工作中..."
+        self.status_label.configure(text=status)
+        self.start_button.configure(text="暂停" if running else "开始")
     
     def start_break(self):
         """开始休息"""
+        self.scheduler.start_break()
+    
+    def on_break_started(self):
+        """调度器进入休息：播放提示音、通知并显示休息窗口"""
         logging.info("开始休息")
-        self.is_break_time = True
+        # 显示器可能已插拔；布局变化后显示区域不同，预加载的媒体不会被采用
+        self.monitors = self.current_monitors()
+        self.prepared_media = self.media_prefetcher.take(self.config, self.break_area())
         self.remaining_break_time = self.config["break_time"] * 60
-        self.status_label.configure(text="休息时间！")
         self.time_label.configure(text=self.format_time(self.remaining_break_time))
         self.progress_bar.set(0)
         
@@ -419,16 +564,12 @@ class BreakReminderApp:
         
         # 仅在非音乐模式下，且启用声音时播放提示音
         if media_type != "music" and self.config["sound_enabled"] and os.path.exists(self.config["sound_file"]):
-            try:
-                pygame.mixer.music.load(self.config["sound_file"])
-                pygame.mixer.music.play()
-            except Exception as e:
-                logging.error(f"播放提示音失败: {str(e)}")
+            self.audio_engine.play_cue(self.config["sound_file"])
         
         # 显示系统通知
         if self.config["show_notifications"]:
             try:
-                notification.notify(
+                notify(
                     title="休息提醒",
                     message=f"工作时间结束！休息 {self.config['break_time']} 分钟",
                     app_name="休息提醒",
@@ -439,26 +580,23 @@ class BreakReminderApp:
         
         # 确保在主线程中显示动画窗口
         self.root.after_idle(self.show_animation_window)
-        
-        # 开始休息倒计时
-        self.break_countdown()
     
     def end_break(self):
         """结束休息
            结束休息后不要自动开始工作倒计时
         """
-        if self.animation_window:
-            self.animation_window.destroy()
-            self.animation_window = None
-        
-        # 停止播放音乐
-        pygame.mixer.music.stop()
-        
-        self.is_break_time = False
-        self.remaining_work_time = self.config["work_time"] * 60
-        self.time_label.configure(text=self.format_time(self.remaining_work_time))
-        self.progress_bar.set(0)
+        self.scheduler.end_break()
+    
+    def on_break_ended(self, completed):
+        """调度器结束休息：关闭窗口、停止音乐并记录专注"""
+        self.release_prepared_media()
+        self.stop_video()
+        self.close_animation_window()
+        # 为下一次休息刷新显示器布局
+        self.monitor_layout.refresh()
         
+        # 淡出背景音乐
+        self.audio_engine.stop_music(self.config["music_fade_ms"])
         
         # 记录专注结束时间
         if self.focus_start_time:
@@ -466,46 +604,26 @@ class BreakReminderApp:
             duration_minutes = (end_time - self.focus_start_time).total_seconds() / 60
             
             # 添加专注记录
-            self.focus_recorder.add_focus_record(
-                focus_goal=self.current_focus_goal,
-                start_time=self.focus_start_time,
-                end_time=end_time,
-                duration_minutes=int(duration_minutes)
-            )
-            
-            # 重置专注时间
-            self.focus_start_time = None
-            self.current_focus_goal = None
+            with self.metrics.timer("records.add_ms"):
+                self.focus_recorder.add_focus_record(
+                    focus_goal=self.current_focus_goal,
+                    start_time=self.focus_start_time,
+                    end_time=end_time,
+                    duration_minutes=int(duration_minutes)
+                )
             
         self.reset_timer()
         
-        
-    
     def show_animation_window(self):
-        """显示动画窗口"""
+        """在每个显示器上显示休息窗口"""
         try:
             logging.info("显示动画窗口")
-            # 创建新窗口
-            self.animation_window = tk.Toplevel(self.root)
-            self.animation_window.title("休息时间！")
-            self.animation_window.attributes('-topmost', True)  # 窗口始终置顶
-            
-            # 禁止用户关闭窗口
-            self.animation_window.protocol("WM_DELETE_WINDOW", self.prevent_animation_close)
-            
-            # 获取屏幕宽度和高度
-            screen_width = self.animation_window.winfo_screenwidth()
-            screen_height = self.animation_window.winfo_screenheight()
-            
-            # 设置窗口大小为屏幕的80%
-            window_width = int(screen_width * 0.8)
-            window_height = int(screen_height * 0.8)
-            
-            # 计算位置使窗口居中
-            x = (screen_width - window_width) // 2
-            y = (screen_height - window_height) // 2
-            
-            self.animation_window.geometry(f"{window_width}x{window_height}+{x}+{y}")
+            # 每个显示器一个窗口，主显示器上的窗口负责播放控制和定时任务
+            self.overlays = BreakOverlays(self.root, self.monitors, button_area=self.ANIMATION_BUTTON_AREA)
+            self.overlays.open("休息时间！", self.prevent_animation_close)
+            self.animation_window = self.overlays.primary
+            # 媒体按所有窗口共同的区域解码一次
+            self.animation_area = self.overlays.area
             
             # 根据选择的媒体类型显示不同内容
             media_type = self.config.get("media_type", "gif")
@@ -524,69 +642,103 @@ class BreakReminderApp:
                 # 显示默认文本
                 self.show_default_animation()
             
-            # 添加结束休息按钮
-            end_button = ctk.CTkButton(self.animation_window, text="结束休息", command=self.end_break)
-            end_button.pack(pady=20)
+            # 每个窗口都添加结束休息按钮
+            for window in self.overlays.windows:
+                end_button = ctk.CTkButton(window, text="结束休息", command=self.end_break)
+                end_button.pack(pady=20)
             
             # 确保窗口显示在最前面
-            self.animation_window.lift()
-            self.animation_window.focus_force()
+            self.overlays.raise_all()
             
             logging.info("动画窗口显示成功")
         except Exception as e:
             logging.error(f"显示动画窗口失败: {str(e)}")
             messagebox.showerror("错误", f"显示休息窗口失败: {str(e)}")
     
+    def close_animation_window(self):
+        """关闭所有显示器上的休息窗口"""
+        if self.overlays is not None:
+            self.overlays.close()
+            self.overlays = None
+        self.animation_window = None
+    
+    def current_monitors(self):
+        """
+        要显示休息窗口的显示器，取自后台枚举的缓存，不阻塞 Tk 线程
+        :return: 显示器列表，主显示器在第一个
+        """
+        monitors = self.monitor_layout.monitors
+        if not self.config["overlay_all_monitors"]:
+            monitors = monitors[:1]
+        return monitors
+    
+    def break_area(self):
+        """
+        休息时媒体的显示区域：各显示器上休息窗口（显示器的80%）共同的媒体区域
+        :return: (宽, 高)
+        """
+        return shared_area(self.monitors, button_area=self.ANIMATION_BUTTON_AREA)
+    
+    def release_prepared_media(self):
+        """释放本次休息未用到的预加载媒体"""
+        if self.prepared_media is not None:
+            self.prepared_media.release()
+            self.prepared_media = None
+    
     def show_gif_animation(self):
         """显示GIF动画"""
-        # 动画帧
-        self.animation_frames = []
-        animation_path = self.config.get("animation_folder", "animations")
-        
-        # 检查动画路径是否存在
-        if os.path.exists(animation_path):
-            animation_files = [f for f in os.listdir(animation_path) if f.endswith(('.gif', '.png', '.jpg', '.jpeg'))]
-            if len(animation_files) > 0:
-                # 如果有GIF动画，使用第一个GIF
-                gif_files = [f for f in animation_files if f.endswith('.gif')]
-                if gif_files:
-                    self.play_gif_animation(os.path.join(animation_path, gif_files[0]))
-                else:
-                    # 否则使用静态图片
-                    img_path = os.path.join(animation_path, animation_files[0])
-                    self.show_static_image(img_path)
-            else:
-                # 如果没有找到图片，显示默认文本
-                self.show_default_animation()
-        else:
-            # 如果动画文件夹不存在，显示默认文本
+        # 真正开始播放时才前进轮换；预加载时预览的正是这个文件，帧已在缓存中
+        animation_file = self.pick_break_animation()
+        
+        if animation_file is None:
+            # 如果动画文件夹不存在或没有找到图片，显示默认文本
             self.show_default_animation()
+        elif animation_file.endswith('.gif'):
+            self.play_gif_animation(animation_file)
+        else:
+            # 否则使用静态图片
+            self.show_static_image(animation_file)
     
     def play_gif_animation(self, gif_path):
-        """播放GIF动画"""
-        try:
-            # 加载GIF
-            gif = Image.open(gif_path)
-            frames = []
-            
-            for frame in ImageSequence.Iterator(gif):
-                frame = frame.copy()
-                frames.append(ImageTk.PhotoImage(frame))
-            
-            # 创建标签来显示GIF
-            gif_label = tk.Label(self.animation_window)
-            gif_label.pack(expand=True, fill="both")
-            
-            def update_frame(idx):
-                frame = frames[idx]
-                idx = (idx + 1) % len(frames)
-                gif_label.configure(image=frame)
-                self.animation_window.after(self.config.get("animation_speed", 100), update_frame, idx)
-            
-            update_frame(0)
-        except Exception as e:
-            print(f"加载GIF动画出错: {e}")
-            self.show_default_animation()
+        """播放GIF动画，帧时长取自文件，帧在后台按窗口大小重采样一次并缓存"""
+        # 在每个窗口中创建标签来显示GIF，共用同一组帧
+        gif_label = self.overlays.label(text="加载中...")
+        gif_label.pack(expand=True, fill="both")
+        
+        future = self.gif_cache.get_async(gif_path, self.animation_area)
+        animation_window = self.animation_window
+        
+        def start_when_ready():
+            if self.animation_window is not animation_window:
+                return
+            if not future.done():
+                self.animation_window.after(50, start_when_ready)
+                return
+            try:
+                player = GifPlayer(future.result())
+            except Exception as e:
+                logging.error(f"加载GIF动画出错: {e}")
+                gif_label.destroy()
+                self.show_default_animation()
+                return
+            gif_label.configure(text="")
+            update_frame(player, 0, None)
+        
+        def update_frame(player, idx, due):
+            if self.animation_window is not animation_window:
+                return
+            now = time.perf_counter()
+            if due is not None:
+                self.metrics.observe("gif.frame_lateness_ms", max(0.0, (now - due) * 1000))
+            frame = player.photo(idx)
+            gif_label.configure(image=frame)
+            gif_label.image = frame  # 保持引用
+            delay = player.duration(idx, self.config.get("animation_speed", 100),
+                                    self.config.get("animation_speed_scale", 1.0))
+            self.animation_window.after(delay, update_frame, player, (idx + 1) % len(player.frames),
+                                        now + delay / 1000)
+        
+        start_when_ready()
     
     def play_video(self):
         """播放视频"""
@@ -598,11 +750,14 @@ class BreakReminderApp:
             return
         
         try:
-            # 创建视频播放框架
-            video_frame = ctk.CTkFrame(self.animation_window)
-            video_frame.pack(expand=True, fill="both", padx=20, pady=20)
+            # 在每个窗口中创建视频播放框架
+            video_frames = []
+            for window in self.overlays.windows:
+                video_frame = ctk.CTkFrame(window)
+                video_frame.pack(expand=True, fill="both", padx=20, pady=20)
+                video_frames.append(video_frame)
             
-            # 创建播放控制框架
+            # 播放控制框架只放在主显示器上
             control_frame = ctk.CTkFrame(self.animation_window)
             control_frame.pack(fill="x", padx=20, pady=5)
             
@@ -611,42 +766,50 @@ class BreakReminderApp:
             self.play_pause_btn = ctk.CTkButton(control_frame, text="暂停", width=80, command=self.toggle_video)
             self.play_pause_btn.pack(side="left", padx=10)
             
-            # 创建用于显示视频的标签
-            self.video_label = tk.Label(video_frame, bg="black")
+            # 创建用于显示视频的标签，黑色背景作为保持宽高比时的黑边；每帧只转换一次，所有窗口共用
+            self.video_label = self.overlays.label(parents=video_frames, bg="black")
             self.video_label.pack(expand=True, fill="both")
+            self.video_label.on_resize(self.on_video_resize)
             
-            # 使用pygame初始化音频
-            pygame.init()
-            pygame.mixer.init()
+            # 播放导入时提取好的音轨；尚未导入时本次无声播放，并在后台导入
+            video_info = self.media_ingest.lookup(video_file)
+            self.audio_playing = bool(video_info and video_info.get("audio_file"))
+            if self.audio_playing:
+                self.audio_engine.play_music(video_info["audio_file"])
+            elif video_info is None:
+                self.media_ingest.ingest_async(video_file)
             
-            # 加载并播放视频音频
-            try:
-                pygame.mixer.music.load(video_file)
-                pygame.mixer.music.play(-1)  # -1表示循环播放
-                self.audio_playing = True
-            except Exception as e:
-                print(f"加载音频失败: {e}")
-                self.audio_playing = False
-            
-            # 打开视频文件
-            self.cap = cv2.VideoCapture(video_file)
+            # 打开视频文件，解码在后台线程中进行；预加载时已经打开并开始解码
+            if self.prepared_media and self.prepared_media.video_decoder:
+                self.video_decoder = self.prepared_media.video_decoder
+                self.prepared_media.video_decoder = None
+            else:
+                # 首次播放视频时才导入OpenCV
+                source, source_info = video_file, video_info
+                if self.proxy_cache is not None:
+                    source, source_info = self.proxy_cache.video_source(video_file, self.animation_area, video_info)
+                self.video_decoder = get_video_pipeline().VideoDecoder(source, info=source_info)
             
-            if not self.cap.isOpened():
+            if not self.video_decoder.is_opened():
+                self.stop_video()
                 messagebox.showerror("错误", "无法打开视频文件")
                 self.show_default_animation()
                 return
             
             # 获取视频属性
-            self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            self.fps = self.cap.get(cv2.CAP_PROP_FPS)
-            self.delay = int(1000 / self.fps)
+            self.frame_width = self.video_decoder.frame_width
+            self.frame_height = self.video_decoder.frame_height
+            self.fps = self.video_decoder.fps
             
             # 计算视频宽高比
             self.video_aspect_ratio = self.frame_width / self.frame_height
             
             
-            # 开始播放视频
+            # 开始播放视频，帧按显示时间戳对齐播放时钟
+            self.video_pacer = get_video_pipeline().FramePacer(self.video_decoder)
+            if not self.video_decoder.is_alive():
+                self.video_decoder.start()
+            self.video_pacer.start()
             self.update_video()
             
         except Exception as e:
@@ -654,69 +817,77 @@ class BreakReminderApp:
             self.show_default_animation()
     
     def update_video(self):
-        """更新视频帧"""
-        if not hasattr(self, 'cap') or not self.cap.isOpened():
+        """更新视频帧，解码已在后台完成，这里只做 PhotoImage 替换"""
+        if self.video_pacer is None or not self.animation_window:
             return
         
         if not self.is_video_playing:
-            # 如果暂停，则延迟更新
+            # 如果暂停，则延迟更新；解码线程在队列满后自动等待
             self.animation_window.after(100, self.update_video)
             return
         
-        ret, frame = self.cap.read()
-        
-        if ret:
-            # 将BGR格式转换为RGB格式
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # 获取窗口当前大小
-            video_width = self.video_label.winfo_width()
-            video_height = self.video_label.winfo_height()
-            
-            if video_width > 1 and video_height > 1:
-                # 调整帧的大小以适应窗口
-                frame_rgb = cv2.resize(frame_rgb, (video_width, video_height))
-            
-            # 将OpenCV图像转换为PIL图像
-            img = Image.fromarray(frame_rgb)
-            
+        start = time.perf_counter()
+        img, delay = self.video_pacer.next_frame()
+        if img is not None:
             # 将PIL图像转换为Tkinter可以显示的格式
+            converted = time.perf_counter()
             img_tk = ImageTk.PhotoImage(image=img)
             
             # 更新标签上的图像
+            displayed = time.perf_counter()
             self.video_label.configure(image=img_tk)
             self.video_label.image = img_tk  # 保持引用
             
-            # 安排下一帧的更新
-            self.animation_window.after(self.delay, self.update_video)
-        else:
-            # 视频结束，重新开始播放
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            self.animation_window.after(self.delay, self.update_video)
+            end = time.perf_counter()
+            self.metrics.observe("video.next_frame_ms", (converted - start) * 1000)
+            self.metrics.observe("video.convert_ms", (displayed - converted) * 1000)
+            self.metrics.observe("video.display_ms", (end - displayed) * 1000)
+            self.metrics.counter("video.frames_presented").inc()
+        
+        # 按下一帧的显示时间戳安排更新
+        self.animation_window.after(delay, self.update_video)
+    
+    def on_video_resize(self, width, height):
+        """视频区域大小变化时重新计算缩放尺寸，不在每帧查询窗口大小"""
+        if self.video_decoder is not None:
+            self.video_decoder.fit_to(width, height)
+    
+    def stop_video(self):
+        """停止视频解码线程并释放视频文件"""
+        if self.video_pacer is not None:
+            stats = self.video_pacer.stats()
+            logging.info(f"视频播放统计: {stats}")
+            self.metrics.counter("video.frames_dropped").inc(stats["dropped"])
+            self.video_pacer = None
+        if self.video_decoder is not None:
+            self.video_decoder.stop()
+            self.video_decoder = None
     
     def toggle_video(self):
         """切换视频播放/暂停状态"""
         self.is_video_playing = not self.is_video_playing
         
+        # 播放时钟和音频一起暂停，恢复后仍保持同步
         if self.is_video_playing:
             self.play_pause_btn.configure(text="暂停")
+            if self.video_pacer:
+                self.video_pacer.resume()
+            if getattr(self, "audio_playing", False):
+                self.audio_engine.resume_music()
         else:
             self.play_pause_btn.configure(text="播放")
+            if self.video_pacer:
+                self.video_pacer.pause()
+            if getattr(self, "audio_playing", False):
+                self.audio_engine.pause_music()
     
     def play_music(self):
         """播放音乐"""
         music_file = self.config.get("music_file", "")
         
         if os.path.exists(music_file):
-            try:
-                # 停止当前播放的音乐
-                pygame.mixer.music.stop()
-                
-                # 加载并播放新音乐文件
-                pygame.mixer.music.load(music_file)
-                pygame.mixer.music.play(-1)  # -1表示循环播放
-            except Exception as e:
-                print(f"播放音乐时出错: {e}")
+            # 在音频线程中替换当前音乐，从磁盘流式读取，无缝循环并淡入
+            self.audio_engine.play_music(music_file, loop=True, fade_ms=self.config["music_fade_ms"])
     
     def show_static_image(self, img_path):
         """显示静态图片"""
@@ -724,7 +895,7 @@ class BreakReminderApp:
             img = Image.open(img_path)
             photo = ImageTk.PhotoImage(img)
             
-            img_label = tk.Label(self.animation_window, image=photo)
+            img_label = self.overlays.label(image=photo)
             img_label.image = photo  # 保持引用
             img_label.pack(expand=True, fill="both")
         except Exception as e:
@@ -733,95 +904,120 @@ class BreakReminderApp:
     
     def show_default_animation(self):
         """显示默认动画（文本）"""
-        message_label = ctk.CTkLabel(
-            self.animation_window, 
-            text="休息时间！\n\n请起身活动，放松眼睛\n\n剩余时间会在主窗口显示", 
-            font=("Arial", 24, "bold")
-        )
-        message_label.pack(expand=True)
+        for window in self.overlays.windows:
+            message_label = ctk.CTkLabel(
+                window, 
+                text="休息时间！\n\n请起身活动，放松眼睛\n\n剩余时间会在主窗口显示", 
+                font=("Arial", 24, "bold")
+            )
+            message_label.pack(expand=True)
     
     def format_time(self, seconds):
         """格式化时间为分:秒的形式"""
         minutes, seconds = divmod(seconds, 60)
         return f"{minutes:02d}:{seconds:02d}"
     
-    def load_config(self):
-        """加载配置文件"""
-        try:
-            config_path = os.path.join(self.get_application_path(), "config.json")
-            logging.info(f"尝试加载配置文件: {config_path}")
-            
-            if os.path.exists(config_path):
-                try:
-                    with open(config_path, "r", encoding="utf-8") as f:
-                        config = json.load(f)
-                    logging.info("成功加载配置文件")
-                    # 确保所有必要的键都存在
-                    for key in DEFAULT_CONFIG:
-                        if key not in config:
-                            config[key] = DEFAULT_CONFIG[key]
-                    return config
-                except Exception as e:
-                    logging.error(f"读取配置文件失败: {str(e)}")
-                    return DEFAULT_CONFIG.copy()
-            else:
-                logging.warning(f"配置文件不存在: {config_path}")
-                return DEFAULT_CONFIG.copy()
-        except Exception as e:
-            logging.error(f"加载配置文件时发生错误: {str(e)}")
-            return DEFAULT_CONFIG.copy()
-    
-    def save_config(self, config):
-        """保存配置文件"""
-        try:
-            config_path = os.path.join(self.get_application_path(), "config.json")
-            logging.info(f"尝试保存配置文件到: {config_path}")
-            
-            # 确保目录存在
-            os.makedirs(os.path.dirname(config_path), exist_ok=True)
-            
-            with open(config_path, "w", encoding="utf-8") as f:
-                json.dump(config, f, indent=4)
-            logging.info("配置文件保存成功")
-            return True
-        except Exception as e:
-            logging.error(f"保存配置文件失败: {str(e)}")
-            return False
-    
     def save_settings(self):
         """保存设置"""
         try:
             logging.info("开始保存设置")
-            # 更新配置
-            self.config["work_time"] = int(self.work_time_var.get())
-            self.config["break_time"] = int(self.break_time_var.get())
-            self.config["sound_enabled"] = self.sound_var.get()
-            self.config["auto_start"] = self.auto_start_var.get()
-            self.config["minimize_to_tray"] = self.tray_var.get()
-            
-            # 更新媒体设置
-            self.config["media_type"] = self.media_type_var.get()
-            self.config["animation_folder"] = self.animation_folder_var.get()
-            self.config["video_file"] = self.video_file_var.get()
-            self.config["music_file"] = self.music_file_var.get()
+            # 更新配置，订阅者只会收到实际改变的项
+            changed = self.config_store.update({
+                "work_time": int(self.work_time_var.get()),
+                "break_time": int(self.break_time_var.get()),
+                "sound_enabled": self.sound_var.get(),
+                "auto_start": self.auto_start_var.get(),
+                "minimize_to_tray": self.tray_var.get(),
+                # 媒体设置
+                "media_type": self.media_type_var.get(),
+                "animation_folder": self.animation_folder_var.get(),
+                "video_file": self.video_file_var.get(),
+                "music_file": self.music_file_var.get(),
+            })
             
-            logging.info(f"更新后的配置: {self.config}")
-            
-            # 保存配置
-            if self.save_config(self.config):
-                messagebox.showinfo("成功", "设置已保存")
-                logging.info("设置保存成功")
-                
-                # 重置计时器以应用新设置
-                self.reset_timer()
-            else:
-                messagebox.showerror("错误", "保存设置失败")
-                logging.error("设置保存失败")
+            logging.debug(f"修改的配置项: {changed}")
+            messagebox.showinfo("成功", "设置已保存")
+            logging.info("设置保存成功")
+        except (ValueError, ConfigError) as e:
+            messagebox.showerror("错误", f"设置无效: {str(e)}")
+            logging.warning(f"设置无效: {str(e)}")
         except Exception as e:
             error_msg = f"保存设置时出错: {str(e)}"
             logging.error(error_msg)
             messagebox.showerror("错误", error_msg)
     
+    def on_durations_changed(self, changed):
+        """
+        工作/休息时长修改后更新调度器，正在进行的倒计时不受影响
+        :param changed: 改变的配置项
+        """
+        work_seconds = changed["work_time"] * 60 if "work_time" in changed else None
+        break_seconds = changed["break_time"] * 60 if "break_time" in changed else None
+        self.scheduler.set_durations(work_seconds, break_seconds)
+        self.remaining_work_time = self.config["work_time"] * 60
+        self.remaining_break_time = self.config["break_time"] * 60
+        if self.scheduler.phase == IDLE:
+            self.time_label.configure(text=self.format_time(self.remaining_work_time))
+    
+    def on_media_config_changed(self, changed):
+        """
+        媒体设置修改后丢弃按旧设置预加载的媒体，下次休息按新设置加载
+        :param changed: 改变的配置项
+        """
+        if not self.is_break_time:
+            self.media_prefetcher.cancel()
+            self.release_prepared_media()
+        if "animation_folder" in changed:
+            self.animation_rotation.catalog.stop()
+            self.animation_rotation = self.create_animation_rotation()
+        elif "animation_rotation" in changed or "animation_weights" in changed:
+            # 文件夹没变，沿用已建好的目录
+            self.animation_rotation = MediaRotation(self.animation_rotation.catalog, self.config["animation_rotation"],
+                                                    self.config["animation_weights"])
+        self.prepare_configured_media()
+    
+    def create_animation_rotation(self):
+        """为当前的动画文件夹建立索引并开始监视"""
+        return create_rotation(self.config.get("animation_folder", "animations"),
+                               self.config["animation_rotation"], self.config["animation_weights"])
+    
+    def pick_break_animation(self, folder=None):
+        """
+        按轮换方式选出本次休息播放的动画文件
+        :param folder: 动画文件夹，默认取设置中的文件夹
+        :return: 文件路径或 None
+        """
+        return pick_from(self.animation_rotation, folder or self.config.get("animation_folder", "animations"))
+    
+    def peek_break_animation(self, folder=None):
+        """
+        下一次休息将要播放的动画文件，不前进轮换
+        :param folder: 动画文件夹，默认取设置中的文件夹
+        :return: 文件路径或 None
+        """
+        return peek_from(self.animation_rotation, folder or self.config.get("animation_folder", "animations"))
+    
+    def prepare_configured_media(self):
+        """
+        在后台准备当前设置的休息媒体，休息开始时直接使用：
+        视频模式导入视频（提取音轨）并生成视频代理，GIF 模式生成 GIF 代理
+        """
+        media_type = self.config.get("media_type")
+        area = self.break_area()
+        if media_type == "video":
+            video_file = self.config.get("video_file", "")
+            if not os.path.exists(video_file):
+                return
+            if self.media_ingest.lookup(video_file) is None:
+                self.media_ingest.ingest_async(video_file)
+            if self.proxy_cache is not None:
+                self.proxy_cache.request(VIDEO, video_file, area)
+        elif media_type == "gif" and self.proxy_cache is not None:
+            # 为下一次将要播放的文件生成代理，不前进轮换
+            animation_file = self.peek_break_animation()
+            if animation_file and animation_file.endswith('.gif'):
+                self.proxy_cache.request(GIF, animation_file, area)
+    
     def show_window(self):
         """显示主窗口"""
         self.root.deiconify()
@@ -840,17 +1036,45 @@ class BreakReminderApp:
     
     def quit_app(self):
         """退出应用"""
-        # 停止计时器
+        self.shutdown()
+        
+        # 写完剩余日志后退出程序
+        log_pipeline.shutdown_logging()
+        sys.exit()
+    
+    def shutdown(self):
+        """停止所有后台线程和子进程、写入未保存的数据并销毁窗口，不退出进程"""
+        # 先停看门狗，退出过程中主线程的阻塞不算卡顿
+        if self.stall_watchdog is not None:
+            self.stall_watchdog.stop()
+        
+        # 停止计时器、预加载和视频解码
         self.pause_timer()
+        self.media_prefetcher.cancel()
+        self.release_prepared_media()
+        self.stop_video()
+        self.close_animation_window()
+        
+        # 写入缓冲中的专注记录和尚未保存的设置
+        self.focus_recorder.close()
+        self.config_store.flush()
+        
+        # 写出最后一份运行指标
+        if self.config["metrics_file"]:
+            self.metrics.dump(os.path.join(self.get_application_path(), self.config["metrics_file"]))
+        self.metrics.stop()
+        self.audio_engine.shutdown()
+        self.media_ingest.shutdown()
+        self.animation_rotation.catalog.stop()
+        if self.proxy_cache is not None:
+            self.proxy_cache.shutdown()
         
         # 移除托盘图标
-        self.tray_icon.stop()
+        if self.tray_icon:
+            self.tray_icon.stop()
         
         # 销毁根窗口
         self.root.destroy()
-        
-        # 退出程序
-        sys.exit()
 
     def on_media_type_change(self, media_type):
         """根据选择的媒体类型显示或隐藏相关设置"""
@@ -880,6 +1104,10 @@ class BreakReminderApp:
                                            filetypes=filetypes)
         if file:
             self.video_file_var.set(file)
+            # 选择后立即在后台提取音轨并读取元数据，并生成显示尺寸的代理
+            self.media_ingest.ingest_async(file)
+            if self.proxy_cache is not None:
+                self.proxy_cache.request(VIDEO, file, self.break_area())
 
     def browse_music_file(self):
         """浏览并选择音乐文件"""
@@ -895,11 +1123,7 @@ class BreakReminderApp:
         return
 
     def refresh_history(self):
-        """刷新历史记录显示"""
-        # 清空现有记录
-        for widget in self.history_frame.winfo_children():
-            widget.destroy()
-        
+        """刷新历史记录显示，记录按页从专注记录器读取"""
         # 获取选择的日期
         date = self.date_entry.get()
         try:
@@ -908,36 +1132,42 @@ class BreakReminderApp:
             messagebox.showerror("错误", "日期格式无效，请使用YYYY-MM-DD格式")
             return
         
-        # 获取记录
-        records = self.focus_recorder.get_records_by_date(date)
-        
-        if not records:
-            ctk.CTkLabel(self.history_frame, text="没有找到记录").pack(pady=10)
+        # 显示记录
+        with self.metrics.timer("history.refresh_ms"):
+            self.history_frame.set_source(
+                self.focus_recorder.count_records_by_date(date),
+                lambda offset, limit: self.focus_recorder.get_records_page(date, offset, limit)
+            )
+            self.refresh_summary(date)
+
+    def refresh_summary(self, date=None):
+        """
+        刷新统计汇总面板
+        :param date: 日期 YYYY-MM-DD，默认使用日期输入框中的日期
+        """
+        date = date or self.date_entry.get()
+        try:
+            datetime.datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
             return
         
-        # 显示记录
-        for record in records:
-            record_frame = ctk.CTkFrame(self.history_frame)
-            record_frame.pack(fill="x", pady=5, padx=5)
-            
-            # 专注目标
-            ctk.CTkLabel(record_frame, text=f"目标: {record['focus_goal']}", 
-                        font=("Arial", 12, "bold")).pack(anchor="w", padx=5, pady=2)
-            
-            # 时间信息
-            start_time = datetime.datetime.fromisoformat(record['start_time'])
-            end_time = datetime.datetime.fromisoformat(record['end_time'])
-            
-            time_info = f"开始: {start_time.strftime('%H:%M:%S')} - 结束: {end_time.strftime('%H:%M:%S')}"
-            ctk.CTkLabel(record_frame, text=time_info).pack(anchor="w", padx=5, pady=2)
-            
-            # 专注时长
-            duration_info = f"专注时长: {record['duration_minutes']} 分钟"
-            ctk.CTkLabel(record_frame, text=duration_info).pack(anchor="w", padx=5, pady=2)
-            
-            # 添加分隔线
-            separator = ctk.CTkFrame(record_frame, height=1, fg_color="gray")
-            separator.pack(fill="x", padx=5, pady=5)
+        summaries = {
+            "day": ("当日", self.focus_stats.day(date)),
+            "week": ("本周", self.focus_stats.week(date)),
+            "month": ("本月", self.focus_stats.month(date)),
+        }
+        for key, (title, summary) in summaries.items():
+            self.summary_labels[key].configure(
+                text=f"{title}: {summary['sessions']} 次专注, 共 {summary['total_minutes']} 分钟"
+            )
+        
+        # 本月时长最多的几个目标
+        goals = sorted(summaries["month"][1]["goals"].items(), key=lambda item: item[1]["total_minutes"], reverse=True)
+        if goals:
+            text = ", ".join(f"{goal} {item['total_minutes']} 分钟" for goal, item in goals[:3])
+            self.summary_goals_label.configure(text=f"本月主要目标: {text}")
+        else:
+            self.summary_goals_label.configure(text="")
 
     def get_application_path(self):
         """获取应用程序路径"""
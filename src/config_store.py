@@ -0,0 +1,177 @@
+import os
+import json
+import logging
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class ConfigError(ValueError):
+    """配置项取值无效"""
+
+
+class ConfigStore:
+    """
+    配置存储
+    读取时逐项校验，无效项回退到默认值并写入日志；修改后延迟合并保存，
+    写入先落到临时文件再替换，崩溃不会留下半个 config.json；
+    订阅者只收到实际改变的配置项
+    """
+
+    def __init__(self, path: str, defaults: Dict[str, Any],
+                 validators: Optional[Dict[str, Callable[[Any], bool]]] = None,
+                 save_delay: float = 0.5):
+        """
+        :param path: 配置文件路径
+        :param defaults: 默认配置，同时决定每一项的类型
+        :param validators: 额外的取值校验，键为配置项，返回 False 表示无效
+        :param save_delay: 修改后多少秒再写文件，期间的修改合并为一次写入
+        """
+        self.path = path
+        self.defaults = defaults
+        self.validators = validators or {}
+        self.save_delay = save_delay
+        # 应用直接读取的配置字典，只通过 update 修改
+        self.data: Dict[str, Any] = dict(defaults)
+        self._observers = []
+        self._lock = threading.Lock()
+        self._save_timer = None
+
+    def validate(self, key: str, value: Any) -> Any:
+        """
+        校验并规范化一项配置
+        :param key: 配置项
+        :param value: 取值
+        :return: 规范化后的取值（如 int 转为 float）
+        :raises ConfigError: 取值无效
+        """
+        if key in self.defaults:
+            default = self.defaults[key]
+            if isinstance(default, bool):
+                if not isinstance(value, bool):
+                    raise ConfigError(f"{key} 应为布尔值: {value!r}")
+            elif isinstance(default, float):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ConfigError(f"{key} 应为数字: {value!r}")
+                value = float(value)
+            elif isinstance(default, int):
+                if isinstance(value, bool) or not isinstance(value, int):
+                    raise ConfigError(f"{key} 应为整数: {value!r}")
+            elif isinstance(default, str) and not isinstance(value, str):
+                raise ConfigError(f"{key} 应为字符串: {value!r}")
+        validator = self.validators.get(key)
+        if validator is not None and not validator(value):
+            raise ConfigError(f"{key} 的取值无效: {value!r}")
+        return value
+
+    def load(self) -> Dict[str, Any]:
+        """
+        读取配置文件
+        文件损坏时改名为 .corrupt 保留下来并使用默认配置；单项无效时只回退该项
+        :return: 配置字典
+        """
+        data = dict(self.defaults)
+        if not os.path.exists(self.path):
+            logging.warning(f"配置文件不存在，使用默认配置: {self.path}")
+            self.data = data
+            return self.data
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+            if not isinstance(loaded, dict):
+                raise ValueError("顶层不是对象")
+        except (OSError, ValueError) as e:
+            corrupt_path = self.path + ".corrupt"
+            logging.error(f"配置文件无法读取，已备份为 {corrupt_path} 并使用默认配置: {str(e)}")
+            try:
+                os.replace(self.path, corrupt_path)
+            except OSError:
+                pass
+            self.data = data
+            return self.data
+
+        for key, value in loaded.items():
+            try:
+                data[key] = self.validate(key, value)
+            except ConfigError as e:
+                logging.warning(f"配置项无效，使用默认值 {self.defaults.get(key)!r}: {str(e)}")
+        logging.info(f"成功加载配置文件: {self.path}")
+        self.data = data
+        return self.data
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None], keys: Optional[Iterable[str]] = None):
+        """
+        订阅配置修改
+        :param callback: callback(changed)，changed 为 {配置项: 新值}
+        :param keys: 只关心的配置项，None 表示全部
+        """
+        self._observers.append((callback, frozenset(keys) if keys is not None else None))
+
+    def unsubscribe(self, callback: Callable[[Dict[str, Any]], None]):
+        """
+        取消订阅
+        :param callback: 之前订阅的回调
+        """
+        self._observers = [(cb, keys) for cb, keys in self._observers if cb != callback]
+
+    def update(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        修改配置：先整体校验，全部有效才应用，然后通知订阅者并安排保存
+        :param changes: {配置项: 新值}
+        :return: 实际改变的配置项
+        :raises ConfigError: 任一项无效，此时不做任何修改
+        """
+        validated = {key: self.validate(key, value) for key, value in changes.items()}
+        changed = {key: value for key, value in validated.items() if self.data.get(key) != value}
+        if not changed:
+            return changed
+        self.data.update(changed)
+        self._schedule_save()
+        for callback, keys in list(self._observers):
+            relevant = changed if keys is None else {k: v for k, v in changed.items() if k in keys}
+            if relevant:
+                callback(relevant)
+        return changed
+
+    def _schedule_save(self):
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.save_delay, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def save(self) -> bool:
+        """
+        立即保存：写临时文件、fsync，再替换原文件
+        :return: 是否成功
+        """
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            directory = os.path.dirname(os.path.abspath(self.path))
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".config-", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump(self.data, f, indent=4, ensure_ascii=False)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    os.remove(tmp_path)
+                    raise
+            except OSError as e:
+                logging.error(f"保存配置文件失败: {str(e)}")
+                return False
+            logging.info(f"配置文件保存成功: {self.path}")
+            return True
+
+    def flush(self):
+        """退出前调用：有尚未写入的修改时立即保存"""
+        with self._lock:
+            pending = self._save_timer is not None
+        if pending:
+            self.save()
@@ -1,47 +1,146 @@
 import os
 import json
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.focus_storage import create_storage, import_day_files_to_sqlite, migrate_json_day_files
 
 class FocusRecorder:
-    def __init__(self, data_dir: str = "dirty"):
+    # 恢复日志：写缓冲中尚未落盘的记录
+    JOURNAL_FILE = "pending_records.journal"
+    # 读缓存最多保留的天数
+    CACHE_DAYS = 32
+
+    def __init__(self, data_dir: str = "dirty", backend: str = "jsonl",
+                 write_behind: bool = False, flush_interval: float = 5.0):
         """
         初始化专注记录器
         :param data_dir: 存储专注记录数据的目录
+        :param backend: 存储后端，jsonl（追加写）、sqlite（带索引的数据库）或 json（旧版整文件重写）
+        :param write_behind: 是否缓冲新记录并定时批量写入
+        :param flush_interval: 写缓冲的刷新间隔（秒）
         """
         self.data_dir = data_dir
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
 
-    def _get_today_file_path(self) -> str:
+        # 追加写后端启动时把旧版的每日 JSON 文件转换过来
+        if backend == "jsonl":
+            migrate_json_day_files(data_dir)
+        self.storage = create_storage(backend, data_dir)
+        self._listeners: List[Callable[[str, Dict], None]] = []
+
+        # 首次使用 SQLite 后端时导入已有的每日文件
+        if backend == "sqlite" and self.storage.is_empty():
+            import_day_files_to_sqlite(data_dir, self.storage)
+
+        # 读缓存：日期 -> (数据版本, 记录)
+        self._cache: "OrderedDict[str, Tuple[tuple, List[Dict]]]" = OrderedDict()
+
+        # 写缓冲：日期 -> 尚未写入存储的记录
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, List[Dict]] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_timer = None
+        self.journal_path = os.path.join(data_dir, self.JOURNAL_FILE)
+        self._recover_journal()
+        self._journal = open(self.journal_path, 'a', encoding='utf-8') if write_behind else None
+
+    def _recover_journal(self):
         """
-        获取今天的记录文件路径
-        :return: 文件路径
+        把上次异常退出时留在恢复日志中的记录写入存储
+        刷新写入存储后、清空日志前崩溃会留下已写入的记录，按记录内容去重
         """
-        today = datetime.now().strftime("%Y-%m-%d")
-        return os.path.join(self.data_dir, f"{today}.json")
+        if not os.path.exists(self.journal_path):
+            return
+        recovered: Dict[str, List[Dict]] = {}
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 崩溃时写了一半的最后一行
+                    continue
+                recovered.setdefault(entry["date"], []).append(entry["record"])
 
-    def _load_today_records(self) -> List[Dict]:
+        restored = 0
+        for date, records in recovered.items():
+            existing = {self._record_key(record) for record in self.storage.load(date)}
+            missing = [record for record in records if self._record_key(record) not in existing]
+            if missing:
+                self.storage.append_many(date, missing)
+                restored += len(missing)
+        os.remove(self.journal_path)
+        if restored:
+            logging.info(f"已从恢复日志写回 {restored} 条专注记录")
+
+    @staticmethod
+    def _record_key(record: Dict) -> tuple:
+        return record.get("record_time"), record.get("start_time"), record.get("focus_goal")
+
+    def flush(self):
+        """把写缓冲中的记录批量写入存储，每个日期一次写入，随后清空恢复日志"""
+        with self._pending_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            written = []
+            try:
+                for date, records in pending.items():
+                    self.storage.append_many(date, records)
+                    written.append(date)
+            except (OSError, sqlite3.Error) as e:
+                # 未写入的记录放回缓冲，恢复日志保留，下次刷新或启动时补写
+                logging.error(f"批量写入专注记录失败: {str(e)}")
+                for date, records in pending.items():
+                    if date not in written:
+                        self._pending[date] = records + self._pending.get(date, [])
+                return
+            self._journal.seek(0)
+            self._journal.truncate()
+            logging.info(f"已批量写入 {sum(len(records) for records in pending.values())} 条专注记录")
+
+    def close(self):
+        """退出前调用：写入缓冲中的全部记录"""
+        self.flush()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+            # 全部写入成功才删除恢复日志
+            if not self._pending:
+                os.remove(self.journal_path)
+
+    def subscribe(self, callback: Callable[[str, Dict], None]):
         """
-        加载今天的记录
-        :return: 记录列表
+        订阅新增记录
+        :param callback: callback(日期, 记录)，在记录写入之后调用
         """
-        file_path = self._get_today_file_path()
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
+        self._listeners.append(callback)
 
-    def _save_records(self, records: List[Dict]):
+    def unsubscribe(self, callback: Callable[[str, Dict], None]):
         """
-        保存记录到文件
-        :param records: 记录列表
+        取消订阅
+        :param callback: 之前订阅的回调
+        """
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _get_today_date(self) -> str:
         """
-        file_path = self._get_today_file_path()
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(records, f, ensure_ascii=False, indent=2)
+        获取今天的日期字符串
+        :return: YYYY-MM-DD
+        """
+        return datetime.now().strftime("%Y-%m-%d")
 
-    def add_focus_record(self, 
+    def add_focus_record(self,
                         focus_goal: str,
                         start_time: datetime,
                         end_time: datetime,
@@ -55,8 +154,6 @@ class FocusRecorder:
         :param duration_minutes: 专注时长（分钟）
         :param notes: 备注（可选）
         """
-        records = self._load_today_records()
-        
         record = {
             "focus_goal": focus_goal,
             "start_time": start_time.isoformat(),
@@ -65,16 +162,57 @@ class FocusRecorder:
             "notes": notes,
             "record_time": datetime.now().isoformat()
         }
-        
-        records.append(record)
-        self._save_records(records)
+
+        date = self._get_today_date()
+        if self.write_behind:
+            with self._pending_lock:
+                # 先写恢复日志（只交给操作系统，不 fsync），进程崩溃后下次启动可补写
+                self._journal.write(json.dumps({"date": date, "record": record}, ensure_ascii=False) + "\n")
+                self._journal.flush()
+                self._pending.setdefault(date, []).append(record)
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+        else:
+            self.storage.append(date, record)
+        for callback in list(self._listeners):
+            callback(date, record)
+
+    def import_records(self, date: str, records: List[Dict]):
+        """
+        批量导入某一天的记录，每个日期文件只写一次
+        导入不会通知订阅者，统计汇总需要重新计算
+        :param date: 日期字符串，格式为 YYYY-MM-DD
+        :param records: 记录列表
+        """
+        if records:
+            self.storage.append_many(date, records)
+            self._cache.pop(date, None)
+
+    def iter_records(self, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        按日期顺序逐条产出记录，同一时间只有一天的记录在内存中
+        :param start_date: 起始日期 YYYY-MM-DD（含），None 表示不限
+        :param end_date: 结束日期 YYYY-MM-DD（含），None 表示不限
+        :return: (日期, 记录) 迭代器
+        """
+        self.flush()
+        for date in self.storage.dates():
+            if start_date and date < start_date:
+                continue
+            if end_date and date > end_date:
+                break
+            for record in self.storage.load(date):
+                yield date, record
 
     def get_today_records(self) -> List[Dict]:
         """
         获取今天的专注记录
         :return: 记录列表
         """
-        return self._load_today_records()
+        return self.get_records_by_date(self._get_today_date())
 
     def get_records_by_date(self, date: str) -> List[Dict]:
         """
@@ -82,8 +220,84 @@ class FocusRecorder:
         :param date: 日期字符串，格式为 YYYY-MM-DD
         :return: 记录列表
         """
-        file_path = os.path.join(self.data_dir, f"{date}.json")
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return [] 
\ No newline at end of file
+        return list(self._load_cached(date)) + self._pending_records(date)
+
+    def _load_cached(self, date: str) -> List[Dict]:
+        """读取存储中某一天的记录，文件未变化时直接使用缓存"""
+        signature = self.storage.signature(date)
+        cached = self._cache.get(date)
+        if cached is not None and cached[0] == signature:
+            self._cache.move_to_end(date)
+            return cached[1]
+        records = self.storage.load(date)
+        self._cache[date] = (signature, records)
+        while len(self._cache) > self.CACHE_DAYS:
+            self._cache.popitem(last=False)
+        return records
+
+    def _pending_records(self, date: str) -> List[Dict]:
+        with self._pending_lock:
+            return list(self._pending.get(date, ()))
+
+    def count_records_by_date(self, date: str) -> int:
+        """
+        获取指定日期的记录数
+        :param date: 日期字符串，格式为 YYYY-MM-DD
+        :return: 记录数
+        """
+        cached = self._cache.get(date)
+        if cached is not None and cached[0] == self.storage.signature(date):
+            stored = len(cached[1])
+        else:
+            stored = self.storage.count(date)
+        return stored + len(self._pending_records(date))
+
+    def get_records_page(self, date: str, offset: int, limit: int) -> List[Dict]:
+        """
+        分页获取指定日期的专注记录
+        :param date: 日期字符串，格式为 YYYY-MM-DD
+        :param offset: 起始序号
+        :param limit: 最多条数
+        :return: 记录列表
+        """
+        cached = self._cache.get(date)
+        if cached is not None and cached[0] == self.storage.signature(date):
+            stored = cached[1][offset:offset + limit]
+        else:
+            stored = self.storage.load_page(date, offset, limit)
+        pending = self._pending_records(date)
+        if not pending or len(stored) == limit:
+            return stored
+        # 缓冲中的记录排在已写入记录之后
+        stored_count = self.storage.count(date)
+        start = max(0, offset - stored_count)
+        return stored + pending[start:start + limit - len(stored)]
+
+    def get_records_between(self, start: datetime, end: datetime) -> List[Dict]:
+        """
+        获取开始时间在 [start, end) 内的专注记录
+        :param start: 起始时间
+        :param end: 结束时间（不含）
+        :return: 按开始时间排序的记录列表
+        """
+        self.flush()
+        return self.storage.records_between(start, end)
+
+    def get_records_by_goal(self, goal: str) -> List[Dict]:
+        """
+        获取某个专注目标的全部记录
+        :param goal: 专注目标
+        :return: 按开始时间排序的记录列表
+        """
+        self.flush()
+        return self.storage.records_by_goal(goal)
+
+    def get_goal_summary(self, start: datetime, end: datetime) -> Dict[str, Dict]:
+        """
+        按专注目标汇总 [start, end) 内的专注次数与总时长
+        :param start: 起始时间
+        :param end: 结束时间（不含）
+        :return: {目标: {"sessions": 次数, "total_minutes": 分钟}}
+        """
+        self.flush()
+        return self.storage.summary_between(start, end)
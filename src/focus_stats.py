@@ -0,0 +1,207 @@
+import os
+import json
+import logging
+import tempfile
+import threading
+from datetime import date as Date, timedelta
+from typing import Dict, List
+
+
+def _empty_bucket() -> Dict:
+    return {"sessions": 0, "total_minutes": 0, "goals": {}}
+
+
+def _add_to_bucket(bucket: Dict, goal: str, minutes: int):
+    bucket["sessions"] += 1
+    bucket["total_minutes"] += minutes
+    goal_bucket = bucket["goals"].setdefault(goal, {"sessions": 0, "total_minutes": 0})
+    goal_bucket["sessions"] += 1
+    goal_bucket["total_minutes"] += minutes
+
+
+def week_key(day: str) -> str:
+    """
+    日期所在的 ISO 周
+    :param day: YYYY-MM-DD
+    :return: YYYY-Www
+    """
+    year, week, _ = Date.fromisoformat(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def month_key(day: str) -> str:
+    """
+    日期所在的月份
+    :param day: YYYY-MM-DD
+    :return: YYYY-MM
+    """
+    return day[:7]
+
+
+class FocusStats:
+    """
+    专注统计
+    按天、周、月维护预先汇总好的总时长、专注次数和各目标的合计，
+    每次添加记录时增量更新并写入数据目录，查询时不再逐条解析记录
+    """
+
+    ROLLUP_FILE = "focus_rollups.json"
+    VERSION = 1
+
+    def __init__(self, recorder):
+        """
+        :param recorder: 专注记录器，统计会订阅它的新增记录
+        """
+        self.recorder = recorder
+        self.file_path = os.path.join(recorder.data_dir, self.ROLLUP_FILE)
+        self._lock = threading.Lock()
+        self.days: Dict[str, Dict] = {}
+        self.weeks: Dict[str, Dict] = {}
+        self.months: Dict[str, Dict] = {}
+
+        if not self._load() or not self._is_current():
+            self.rebuild()
+        recorder.subscribe(self.on_record_added)
+
+    @classmethod
+    def invalidate(cls, data_dir: str):
+        """
+        删除已保存的汇总，下次启动时重新计算；用于绕过记录器订阅的批量导入
+        :param data_dir: 数据目录
+        """
+        file_path = os.path.join(data_dir, cls.ROLLUP_FILE)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def _load(self) -> bool:
+        """读取已保存的汇总，文件不存在或损坏时返回 False"""
+        if not os.path.exists(self.file_path):
+            return False
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"读取统计汇总失败，将重新计算: {str(e)}")
+            return False
+        if data.get("version") != self.VERSION:
+            return False
+        self.days = data.get("days", {})
+        self.weeks = data.get("weeks", {})
+        self.months = data.get("months", {})
+        return True
+
+    def _is_current(self) -> bool:
+        """
+        检查汇总是否与记录一致
+        记录只会追加到当天，因此只需对比日期集合和最近一天的记录数；
+        没有记录的日期（例如损坏的尾行被截掉后留下的空文件）不会出现在汇总中，只需确认它们确实没有记录
+        """
+        dates = self.recorder.storage.dates()
+        if set(self.days) - set(dates):
+            return False
+        for day in set(dates) - set(self.days):
+            if self.recorder.count_records_by_date(day):
+                return False
+        if not dates:
+            return True
+        sessions = self.days[dates[-1]]["sessions"] if dates[-1] in self.days else 0
+        return self.recorder.count_records_by_date(dates[-1]) == sessions
+
+    def rebuild(self):
+        """从全部记录重新计算汇总"""
+        with self._lock:
+            self.days, self.weeks, self.months = {}, {}, {}
+            for day in self.recorder.storage.dates():
+                for record in self.recorder.get_records_by_date(day):
+                    self._add(day, record)
+            self._save()
+        logging.info(f"已重新计算统计汇总: {len(self.days)} 天")
+
+    def _add(self, day: str, record: Dict):
+        goal = record.get("focus_goal") or "未设置目标"
+        minutes = int(record.get("duration_minutes") or 0)
+        for rollup, key in ((self.days, day), (self.weeks, week_key(day)), (self.months, month_key(day))):
+            _add_to_bucket(rollup.setdefault(key, _empty_bucket()), goal, minutes)
+
+    def _save(self):
+        """先写临时文件再替换，写入中途退出不会损坏已有的汇总"""
+        data = {"version": self.VERSION, "days": self.days, "weeks": self.weeks, "months": self.months}
+        fd, tmp_path = tempfile.mkstemp(dir=self.recorder.data_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.file_path)
+        except OSError as e:
+            logging.error(f"保存统计汇总失败: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def on_record_added(self, day: str, record: Dict):
+        """
+        专注记录器新增记录时的回调
+        :param day: 记录所在的日期
+        :param record: 新记录
+        """
+        with self._lock:
+            self._add(day, record)
+            self._save()
+
+    def day(self, day: str) -> Dict:
+        """
+        某一天的汇总
+        :param day: YYYY-MM-DD
+        :return: {"sessions", "total_minutes", "goals": {目标: {"sessions", "total_minutes"}}}
+        """
+        return self.days.get(day, _empty_bucket())
+
+    def week(self, day: str) -> Dict:
+        """
+        日期所在 ISO 周的汇总
+        :param day: YYYY-MM-DD
+        """
+        return self.weeks.get(week_key(day), _empty_bucket())
+
+    def month(self, day: str) -> Dict:
+        """
+        日期所在月份的汇总
+        :param day: YYYY-MM-DD
+        """
+        return self.months.get(month_key(day), _empty_bucket())
+
+    def daily_totals(self, start: str, end: str) -> List[Dict]:
+        """
+        [start, end] 内每天的合计，没有记录的日期为 0，适合画趋势图
+        :param start: 起始日期 YYYY-MM-DD
+        :param end: 结束日期 YYYY-MM-DD（含）
+        :return: [{"date", "sessions", "total_minutes"}]
+        """
+        totals = []
+        day = Date.fromisoformat(start)
+        last = Date.fromisoformat(end)
+        while day <= last:
+            bucket = self.days.get(day.isoformat())
+            totals.append({
+                "date": day.isoformat(),
+                "sessions": bucket["sessions"] if bucket else 0,
+                "total_minutes": bucket["total_minutes"] if bucket else 0,
+            })
+            day += timedelta(days=1)
+        return totals
+
+    def summary_between(self, start: str, end: str) -> Dict:
+        """
+        合并 [start, end] 内每天的汇总，耗时只与天数有关
+        :param start: 起始日期 YYYY-MM-DD
+        :param end: 结束日期 YYYY-MM-DD（含）
+        :return: 与 day() 相同结构的汇总
+        """
+        total = _empty_bucket()
+        for day, bucket in self.days.items():
+            if start <= day <= end:
+                total["sessions"] += bucket["sessions"]
+                total["total_minutes"] += bucket["total_minutes"]
+                for goal, goal_bucket in bucket["goals"].items():
+                    merged = total["goals"].setdefault(goal, {"sessions": 0, "total_minutes": 0})
+                    merged["sessions"] += goal_bucket["sessions"]
+                    merged["total_minutes"] += goal_bucket["total_minutes"]
+        return total
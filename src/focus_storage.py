@@ -0,0 +1,559 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+
+class _DayFileStorage:
+    """按天分文件存储的公共部分，子类提供 suffix、load 和 append"""
+
+    suffix = ""
+    # 列出日期时识别的文件后缀
+    date_suffixes = ()
+
+    def __init__(self, data_dir: str):
+        """
+        :param data_dir: 存储专注记录数据的目录
+        """
+        self.data_dir = data_dir
+
+    def _get_file_path(self, date: str) -> str:
+        return os.path.join(self.data_dir, f"{date}{self.suffix}")
+
+    def dates(self) -> List[str]:
+        """
+        列出已有记录的日期
+        :return: 升序的日期列表
+        """
+        dates = set()
+        for name in os.listdir(self.data_dir):
+            for suffix in self.date_suffixes:
+                if name.endswith(suffix) and len(name) == 10 + len(suffix):
+                    dates.add(name[:10])
+        return sorted(dates)
+
+    def signature(self, date: str) -> tuple:
+        """
+        某一天数据的版本标识，文件被写入后会改变，用于判断读缓存是否失效
+        :param date: 日期字符串
+        :return: 各候选文件的 (修改时间, 大小)
+        """
+        signature = []
+        for suffix in self.date_suffixes:
+            try:
+                stat = os.stat(os.path.join(self.data_dir, f"{date}{suffix}"))
+            except FileNotFoundError:
+                signature.append(None)
+                continue
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def count(self, date: str) -> int:
+        """
+        某一天的记录数
+        :param date: 日期字符串
+        :return: 记录数
+        """
+        return len(self.load(date))
+
+    def load_page(self, date: str, offset: int, limit: int) -> List[Dict]:
+        """
+        读取某一天的一页记录
+        :param date: 日期字符串
+        :param offset: 起始序号
+        :param limit: 最多条数
+        :return: 记录列表
+        """
+        return self.load(date)[offset:offset + limit]
+
+    def records_between(self, start: datetime, end: datetime) -> List[Dict]:
+        """
+        获取开始时间落在 [start, end) 内的记录
+        文件按写入当天划分，跨零点的专注会落在次日文件里，因此多扫描前一天
+        :param start: 起始时间
+        :param end: 结束时间（不含）
+        :return: 按开始时间排序的记录列表
+        """
+        start_iso, end_iso = start.isoformat(), end.isoformat()
+        day = start.date()
+        last_day = end.date() + timedelta(days=1)
+        records = []
+        while day <= last_day:
+            for record in self.load(day.strftime("%Y-%m-%d")):
+                if start_iso <= record.get("start_time", "") < end_iso:
+                    records.append(record)
+            day += timedelta(days=1)
+        return sorted(records, key=lambda r: r["start_time"])
+
+    def records_by_goal(self, goal: str) -> List[Dict]:
+        """
+        获取某个专注目标的全部记录
+        :param goal: 专注目标
+        :return: 按开始时间排序的记录列表
+        """
+        records = [r for date in self.dates() for r in self.load(date) if r.get("focus_goal") == goal]
+        return sorted(records, key=lambda r: r.get("start_time", ""))
+
+    def summary_between(self, start: datetime, end: datetime) -> Dict[str, Dict]:
+        """
+        按专注目标汇总 [start, end) 内的次数与时长
+        :param start: 起始时间
+        :param end: 结束时间（不含）
+        :return: {目标: {"sessions": 次数, "total_minutes": 分钟}}
+        """
+        summary = {}
+        for record in self.records_between(start, end):
+            entry = summary.setdefault(record.get("focus_goal"), {"sessions": 0, "total_minutes": 0})
+            entry["sessions"] += 1
+            entry["total_minutes"] += record.get("duration_minutes") or 0
+        return summary
+
+
+class JsonDayStorage(_DayFileStorage):
+    """旧版存储：每天一个 JSON 数组文件，每次写入都要整体重写"""
+
+    suffix = ".json"
+    date_suffixes = (".json",)
+
+    def load(self, date: str) -> List[Dict]:
+        """
+        读取某一天的全部记录
+        :param date: 日期字符串，格式为 YYYY-MM-DD
+        :return: 记录列表
+        """
+        file_path = self._get_file_path(date)
+        if os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return []
+
+    def append(self, date: str, record: Dict):
+        """
+        追加一条记录（读出整个文件再整体写回）
+        :param date: 日期字符串
+        :param record: 记录
+        """
+        self.append_many(date, [record])
+
+    def append_many(self, date: str, records: List[Dict]):
+        """
+        追加多条记录，整个文件只重写一次
+        :param date: 日期字符串
+        :param records: 记录列表
+        """
+        existing = self.load(date)
+        existing.extend(records)
+        with open(self._get_file_path(date), 'w', encoding='utf-8') as f:
+            json.dump(existing, f, ensure_ascii=False, indent=2)
+
+
+class JsonLinesStorage(_DayFileStorage):
+    """
+    追加写存储：每天一个 JSON Lines 文件，每条记录占一行
+    写入只需一次 append + fsync，与当天已有记录数无关；
+    崩溃最多留下一行不完整的尾行，读取时会被跳过，下次写入前会被截掉
+    """
+
+    suffix = ".jsonl"
+    date_suffixes = (".jsonl", ".json")
+
+    def __init__(self, data_dir: str):
+        """
+        :param data_dir: 存储专注记录数据的目录
+        """
+        super().__init__(data_dir)
+        # 每个文件的行起始偏移索引: 路径 -> (已索引的字节数, 偏移列表)
+        self._line_index: Dict[str, tuple] = {}
+
+    def _index_lines(self, file_path: str) -> List[int]:
+        """
+        获取文件中每条有效记录的起始字节偏移，损坏的行与 load 一样不计入
+        文件只会追加，因此只需扫描并校验上次索引之后新增的部分，每行只解析一次
+        """
+        size = os.path.getsize(file_path)
+        indexed_size, offsets = self._line_index.get(file_path, (0, []))
+        if size < indexed_size:
+            # 文件被替换或截断，重建索引
+            indexed_size, offsets = 0, []
+        if size > indexed_size:
+            offsets = list(offsets)
+            with open(file_path, 'rb') as f:
+                f.seek(indexed_size)
+                position = indexed_size
+                for line in f:
+                    # 末尾不完整的行（正在写入或崩溃残留）暂不索引
+                    if not line.endswith(b"\n"):
+                        break
+                    if self._parse_line(line) is not None:
+                        offsets.append(position)
+                    position += len(line)
+            indexed_size = position
+            self._line_index[file_path] = (indexed_size, offsets)
+        return offsets
+
+    @staticmethod
+    def _parse_line(line: bytes) -> Optional[Dict]:
+        """解析一行记录，空行和损坏的行返回 None"""
+        if not line.strip():
+            return None
+        try:
+            return json.loads(line.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+
+    def count(self, date: str) -> int:
+        """
+        某一天的记录数，借助行偏移索引，不重复解析
+        :param date: 日期字符串
+        :return: 记录数
+        """
+        file_path = self._get_file_path(date)
+        if not os.path.exists(file_path):
+            return super().count(date)
+        return len(self._index_lines(file_path))
+
+    def load_page(self, date: str, offset: int, limit: int) -> List[Dict]:
+        """
+        读取某一天的一页记录，借助行偏移索引直接定位，只解析这一页
+        :param date: 日期字符串
+        :param offset: 起始序号
+        :param limit: 最多条数
+        :return: 记录列表
+        """
+        file_path = self._get_file_path(date)
+        if not os.path.exists(file_path):
+            return super().load_page(date, offset, limit)
+        offsets = self._index_lines(file_path)[offset:offset + limit]
+        if not offsets:
+            return []
+
+        records = []
+        with open(file_path, 'rb') as f:
+            # 索引只包含有效的行，逐条定位以跳过中间的损坏行
+            for position in offsets:
+                f.seek(position)
+                record = self._parse_line(f.readline())
+                if record is not None:
+                    records.append(record)
+        return records
+
+    def load(self, date: str) -> List[Dict]:
+        """
+        读取某一天的全部记录，尚未迁移的旧版 JSON 文件也能读取
+        :param date: 日期字符串，格式为 YYYY-MM-DD
+        :return: 记录列表
+        """
+        file_path = self._get_file_path(date)
+        if not os.path.exists(file_path):
+            return JsonDayStorage(self.data_dir).load(date)
+
+        records = []
+        with open(file_path, 'rb') as f:
+            for line_no, line in enumerate(f, 1):
+                record = self._parse_line(line)
+                if record is not None:
+                    records.append(record)
+                elif line.strip():
+                    logging.warning(f"跳过损坏的记录行: {file_path}:{line_no}")
+        return records
+
+    def append(self, date: str, record: Dict):
+        """
+        追加一条记录
+        :param date: 日期字符串
+        :param record: 记录
+        """
+        self.append_many(date, [record])
+
+    def append_many(self, date: str, records: List[Dict]):
+        """
+        追加多条记录，一次写入 + 一次 fsync
+        :param date: 日期字符串
+        :param records: 记录列表
+        """
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        file_path = self._get_file_path(date)
+        with open(file_path, 'a+b') as f:
+            self._truncate_partial_tail(f, file_path)
+            f.write(data.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+
+    @staticmethod
+    def _truncate_partial_tail(f, file_path: str):
+        """
+        截掉崩溃留下的没有换行符的尾行，否则新记录会接在它后面，和它一起变成一行损坏的记录
+        :param f: 以 a+b 打开的文件
+        :param file_path: 文件路径，用于日志
+        """
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        keep = 0
+        position = end
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                keep = position + newline + 1
+                break
+        logging.warning(f"丢弃不完整的尾行: {file_path}, {end - keep} 字节")
+        f.truncate(keep)
+
+
+class SqliteStorage:
+    """
+    SQLite 存储：所有记录存在一个数据库里，
+    start_time 与 focus_goal 上建有索引，跨天范围查询和聚合只需一次查询
+    """
+
+    columns = ("focus_goal", "start_time", "end_time", "duration_minutes", "notes", "record_time")
+
+    def __init__(self, data_dir: str, db_name: str = "focus_records.db"):
+        """
+        :param data_dir: 数据目录
+        :param db_name: 数据库文件名
+        """
+        self.data_dir = data_dir
+        self.db_path = os.path.join(data_dir, db_name)
+        self._lock = threading.Lock()
+        # 本连接写入的次数，PRAGMA data_version 只反映其他连接的修改
+        self._writes = 0
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS focus_records (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    day TEXT NOT NULL,
+                    focus_goal TEXT,
+                    start_time TEXT,
+                    end_time TEXT,
+                    duration_minutes INTEGER,
+                    notes TEXT,
+                    record_time TEXT
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_records_day ON focus_records(day)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_records_start ON focus_records(start_time)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_records_goal ON focus_records(focus_goal, start_time)")
+
+    def _to_dicts(self, rows) -> List[Dict]:
+        return [{column: row[column] for column in self.columns} for row in rows]
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def is_empty(self) -> bool:
+        """
+        数据库中是否还没有任何记录
+        :return: 是否为空
+        """
+        return not self._query("SELECT 1 FROM focus_records LIMIT 1")
+
+    def load(self, date: str) -> List[Dict]:
+        """
+        读取某一天的全部记录
+        :param date: 日期字符串，格式为 YYYY-MM-DD
+        :return: 记录列表
+        """
+        return self._to_dicts(self._query("SELECT * FROM focus_records WHERE day = ? ORDER BY id", (date,)))
+
+    def append(self, date: str, record: Dict):
+        """
+        追加一条记录
+        :param date: 日期字符串
+        :param record: 记录
+        """
+        self.append_many(date, [record])
+
+    def append_many(self, date: str, records: List[Dict]):
+        """
+        在一个事务内追加多条记录
+        :param date: 日期字符串
+        :param records: 记录列表
+        """
+        rows = [(date,) + tuple(record.get(column) for column in self.columns) for record in records]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO focus_records (day, {', '.join(self.columns)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._writes += 1
+
+    def signature(self, date: str) -> tuple:
+        """
+        数据的版本标识，任何写入后都会改变
+        :param date: 日期字符串（整个数据库共用一个版本）
+        :return: (其他连接的版本, 本连接的写入次数)
+        """
+        return self._query("PRAGMA data_version")[0][0], self._writes
+
+    def count(self, date: str) -> int:
+        """
+        某一天的记录数
+        :param date: 日期字符串
+        :return: 记录数
+        """
+        return self._query("SELECT COUNT(*) AS n FROM focus_records WHERE day = ?", (date,))[0]["n"]
+
+    def load_page(self, date: str, offset: int, limit: int) -> List[Dict]:
+        """
+        读取某一天的一页记录
+        :param date: 日期字符串
+        :param offset: 起始序号
+        :param limit: 最多条数
+        :return: 记录列表
+        """
+        return self._to_dicts(self._query(
+            "SELECT * FROM focus_records WHERE day = ? ORDER BY id LIMIT ? OFFSET ?", (date, limit, offset)
+        ))
+
+    def dates(self) -> List[str]:
+        """
+        列出已有记录的日期
+        :return: 升序的日期列表
+        """
+        return [row["day"] for row in self._query("SELECT DISTINCT day FROM focus_records ORDER BY day")]
+
+    def records_between(self, start: datetime, end: datetime) -> List[Dict]:
+        """
+        获取开始时间落在 [start, end) 内的记录
+        :param start: 起始时间
+        :param end: 结束时间（不含）
+        :return: 按开始时间排序的记录列表
+        """
+        return self._to_dicts(self._query(
+            "SELECT * FROM focus_records WHERE start_time >= ? AND start_time < ? ORDER BY start_time",
+            (start.isoformat(), end.isoformat())
+        ))
+
+    def records_by_goal(self, goal: str) -> List[Dict]:
+        """
+        获取某个专注目标的全部记录
+        :param goal: 专注目标
+        :return: 按开始时间排序的记录列表
+        """
+        return self._to_dicts(self._query(
+            "SELECT * FROM focus_records WHERE focus_goal = ? ORDER BY start_time", (goal,)
+        ))
+
+    def summary_between(self, start: datetime, end: datetime) -> Dict[str, Dict]:
+        """
+        按专注目标汇总 [start, end) 内的次数与时长
+        :param start: 起始时间
+        :param end: 结束时间（不含）
+        :return: {目标: {"sessions": 次数, "total_minutes": 分钟}}
+        """
+        rows = self._query(
+            """SELECT focus_goal, COUNT(*) AS sessions, COALESCE(SUM(duration_minutes), 0) AS total_minutes
+               FROM focus_records WHERE start_time >= ? AND start_time < ?
+               GROUP BY focus_goal""",
+            (start.isoformat(), end.isoformat())
+        )
+        return {row["focus_goal"]: {"sessions": row["sessions"], "total_minutes": row["total_minutes"]}
+                for row in rows}
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_json_day_files(data_dir: str, remove_legacy: bool = False) -> int:
+    """
+    将旧版 YYYY-MM-DD.json 文件转换为 YYYY-MM-DD.jsonl
+    已存在的 .jsonl 记录会保留在旧记录之后；转换通过临时文件 + 替换完成，
+    中途崩溃不会破坏任何一个文件
+    :param data_dir: 数据目录
+    :param remove_legacy: 是否删除旧文件，否则重命名为 .json.bak
+    :return: 迁移的文件数量
+    """
+    if not os.path.isdir(data_dir):
+        return 0
+
+    legacy = JsonDayStorage(data_dir)
+    migrated = 0
+    # 只处理以日期命名的文件，数据目录中的其他 JSON（如统计汇总）保持不动
+    for date in legacy.dates():
+        name = f"{date}{JsonDayStorage.suffix}"
+        legacy_path = os.path.join(data_dir, name)
+        try:
+            records = legacy.load(date)
+        except (OSError, ValueError) as e:
+            logging.error(f"无法读取旧版记录文件 {legacy_path}: {str(e)}")
+            continue
+
+        target_path = os.path.join(data_dir, f"{date}{JsonLinesStorage.suffix}")
+        tmp_path = target_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            for record in records:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if os.path.exists(target_path):
+                with open(target_path, 'r', encoding='utf-8') as existing:
+                    for line in existing:
+                        if line.strip():
+                            out.write(line if line.endswith("\n") else line + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, target_path)
+
+        if remove_legacy:
+            os.remove(legacy_path)
+        else:
+            os.replace(legacy_path, legacy_path + ".bak")
+        migrated += 1
+        logging.info(f"已迁移记录文件: {legacy_path} -> {target_path}")
+    return migrated
+
+
+def import_day_files_to_sqlite(data_dir: str, storage: SqliteStorage) -> int:
+    """
+    将 .json / .jsonl 每日文件导入 SQLite，每天一个事务
+    原文件保持不动，可随时切回文件后端
+    :param data_dir: 数据目录
+    :param storage: 目标 SQLite 存储
+    :return: 导入的记录数量
+    """
+    source = JsonLinesStorage(data_dir)
+    imported = 0
+    for date in source.dates():
+        try:
+            records = source.load(date)
+        except (OSError, ValueError) as e:
+            logging.error(f"无法读取记录文件 {date}: {str(e)}")
+            continue
+        if records:
+            storage.append_many(date, records)
+            imported += len(records)
+    logging.info(f"已从每日文件导入 {imported} 条记录到 {storage.db_path}")
+    return imported
+
+
+STORAGE_BACKENDS = {
+    "json": JsonDayStorage,
+    "jsonl": JsonLinesStorage,
+    "sqlite": SqliteStorage,
+}
+
+
+def create_storage(backend: str, data_dir: str):
+    """
+    根据名称创建存储后端
+    :param backend: 后端名称
+    :param data_dir: 数据目录
+    :return: 存储后端实例
+    """
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"未知的存储后端: {backend}")
+    return STORAGE_BACKENDS[backend](data_dir)
@@ -0,0 +1,195 @@
+import io
+import os
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from PIL import Image, ImageTk, ImageSequence
+
+
+class GifFrames:
+    """一个 GIF 解码后的帧数据，每帧以 PNG 压缩字节保存，而不是完整的 RGBA 位图"""
+
+    def __init__(self, frames: List[bytes], size: Tuple[int, int], durations: List[int]):
+        """
+        :param frames: 每帧的 PNG 字节
+        :param size: 帧尺寸
+        :param durations: 每帧的显示时长（毫秒），文件未指定时为 0
+        """
+        self.frames = frames
+        self.size = size
+        self.durations = durations
+        self.nbytes = sum(len(frame) for frame in frames)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def image(self, index: int) -> Image.Image:
+        """
+        解压出某一帧
+        :param index: 帧序号
+        :return: PIL 图像
+        """
+        img = Image.open(io.BytesIO(self.frames[index]))
+        img.load()
+        return img
+
+
+def fit_size(size: Tuple[int, int], box: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    计算保持宽高比放入 box 的尺寸
+    :param size: 原始尺寸
+    :param box: 目标区域尺寸
+    :return: 缩放后的尺寸
+    """
+    scale = min(box[0] / size[0], box[1] / size[1])
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def decode_gif(path: str, box: Optional[Tuple[int, int]] = None) -> GifFrames:
+    """
+    解码 GIF 的全部帧并压缩保存
+    :param path: GIF 文件路径
+    :param box: 目标显示区域，给出时每帧按保持宽高比的尺寸重采样一次
+    :return: 帧数据
+    """
+    frames = []
+    durations = []
+    with Image.open(path) as gif:
+        size = gif.size if box is None else fit_size(gif.size, box)
+        for frame in ImageSequence.Iterator(gif):
+            durations.append(int(frame.info.get("duration") or 0))
+            if frame.size != size:
+                frame = frame.convert("RGBA").resize(size, Image.LANCZOS)
+            buffer = io.BytesIO()
+            # 压缩级别取 1：体积已远小于位图，解压也足够快
+            frame.save(buffer, format="PNG", compress_level=1)
+            frames.append(buffer.getvalue())
+    return GifFrames(frames, size, durations)
+
+
+class GifFrameCache:
+    """
+    GIF 帧缓存，在多次休息之间共享
+    以 路径 + 修改时间 + 显示尺寸 为键，文件变化后自动失效；总大小超过上限时淘汰最久未用的 GIF
+    解码和重采样可交给后台线程，Tk 线程不做任何缩放
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024,
+                 decoder: Callable[[str, Optional[Tuple[int, int]]], GifFrames] = decode_gif):
+        """
+        :param max_bytes: 缓存的压缩帧总字节数上限
+        :param decoder: decoder(路径, 显示区域) 返回帧数据，可替换为读取预先缩放好的代理
+        """
+        self.max_bytes = max_bytes
+        self.decoder = decoder
+        self.total_bytes = 0
+        self._entries: "OrderedDict[tuple, GifFrames]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="GifDecoder")
+        self._pending = {}
+
+    def _key(self, path: str, box: Optional[Tuple[int, int]]) -> tuple:
+        return os.path.abspath(path), os.path.getmtime(path), box
+
+    def get(self, path: str, box: Optional[Tuple[int, int]] = None) -> GifFrames:
+        """
+        获取 GIF 的帧数据，未缓存时在当前线程解码
+        :param path: GIF 文件路径
+        :param box: 目标显示区域，None 表示原始尺寸
+        :return: 帧数据
+        """
+        key = self._key(path, box)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        frames = self.decoder(path, box)
+        logging.info(f"已缓存GIF: {path}, {len(frames)} 帧, {frames.size}, {frames.nbytes // 1024} KB")
+        with self._lock:
+            self._store(key, frames)
+        return frames
+
+    def get_async(self, path: str, box: Optional[Tuple[int, int]] = None) -> Future:
+        """
+        在后台线程中获取帧数据，已缓存时返回已完成的 Future
+        :param path: GIF 文件路径
+        :param box: 目标显示区域
+        :return: 结果为 GifFrames 的 Future
+        """
+        key = self._key(path, box)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                future = Future()
+                future.set_result(self._entries[key])
+                return future
+            if key in self._pending:
+                return self._pending[key]
+            future = self._executor.submit(self.get, path, box)
+            self._pending[key] = future
+        future.add_done_callback(lambda _: self._pending.pop(key, None))
+        return future
+
+    def _store(self, key: tuple, frames: GifFrames):
+        # 同一路径的旧版本不会再被用到
+        for old_key in [k for k in self._entries if k[0] == key[0] and k[1] != key[1]]:
+            self.total_bytes -= self._entries.pop(old_key).nbytes
+        if key in self._entries:
+            self.total_bytes -= self._entries.pop(key).nbytes
+        self._entries[key] = frames
+        self.total_bytes += frames.nbytes
+        # 至少保留刚放入的一项
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= evicted.nbytes
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+class GifPlayer:
+    """只为播放位置附近的帧生成 PhotoImage，其余帧保持压缩状态"""
+
+    def __init__(self, frames: GifFrames, window: int = 4):
+        """
+        :param frames: 帧数据
+        :param window: 同时保留的 PhotoImage 数量
+        """
+        self.frames = frames
+        self.window = window
+        self._photos: "OrderedDict[int, ImageTk.PhotoImage]" = OrderedDict()
+
+    def duration(self, index: int, default: int = 100, speed: float = 1.0) -> int:
+        """
+        某一帧的显示时长
+        :param index: 帧序号
+        :param default: 文件未指定或时长过短时使用的毫秒数（与浏览器的处理一致）
+        :param speed: 播放速度倍数
+        :return: 毫秒数
+        """
+        duration = self.frames.durations[index]
+        if duration < 20:
+            duration = default
+        return max(1, int(duration / max(speed, 0.01)))
+
+    def photo(self, index: int) -> ImageTk.PhotoImage:
+        """
+        获取某一帧的 PhotoImage，必须在 Tk 线程中调用
+        :param index: 帧序号
+        :return: PhotoImage
+        """
+        if index in self._photos:
+            self._photos.move_to_end(index)
+            return self._photos[index]
+        photo = ImageTk.PhotoImage(self.frames.image(index))
+        self._photos[index] = photo
+        while len(self._photos) > self.window:
+            self._photos.popitem(last=False)
+        return photo
@@ -0,0 +1,160 @@
+import datetime
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+import customtkinter as ctk
+
+
+class HistoryRow:
+    """一行历史记录的控件，滚动时被重复使用而不是销毁重建"""
+
+    def __init__(self, master, height: int):
+        self.frame = ctk.CTkFrame(master, height=height)
+        self.frame.pack_propagate(False)
+
+        # 专注目标
+        self.goal_label = ctk.CTkLabel(self.frame, text="", font=("Arial", 12, "bold"), anchor="w")
+        self.goal_label.pack(fill="x", padx=5, pady=(4, 0))
+
+        # 时间信息
+        self.time_label = ctk.CTkLabel(self.frame, text="", anchor="w")
+        self.time_label.pack(fill="x", padx=5)
+
+        # 专注时长
+        self.duration_label = ctk.CTkLabel(self.frame, text="", anchor="w")
+        self.duration_label.pack(fill="x", padx=5)
+
+    def show(self, record: Dict):
+        """
+        显示一条记录
+        :param record: 记录
+        """
+        start_time = datetime.datetime.fromisoformat(record['start_time'])
+        end_time = datetime.datetime.fromisoformat(record['end_time'])
+        self.goal_label.configure(text=f"目标: {record['focus_goal']}")
+        self.time_label.configure(text=f"开始: {start_time.strftime('%H:%M:%S')} - 结束: {end_time.strftime('%H:%M:%S')}")
+        self.duration_label.configure(text=f"专注时长: {record['duration_minutes']} 分钟")
+
+
+class VirtualHistoryList(ctk.CTkFrame):
+    """
+    虚拟化的历史记录列表
+    只为可见的行创建控件，滚动时复用这些控件并换上新的数据；
+    记录按页向数据源请求，不会一次加载整天的记录
+    """
+
+    ROW_HEIGHT = 84
+    PAGE_SIZE = 50
+    # 最多缓存的页数
+    MAX_PAGES = 8
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.rows_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.rows_frame.pack(side="left", fill="both", expand=True)
+        # 行数由可用高度决定，不能反过来让行撑大容器
+        self.rows_frame.pack_propagate(False)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.empty_label = ctk.CTkLabel(self.rows_frame, text="没有找到记录")
+
+        self.rows: List[HistoryRow] = []
+        self.total = 0
+        self.first = 0
+        self._fetch: Callable[[int, int], List[Dict]] = lambda offset, limit: []
+        self._pages: "OrderedDict[int, List[Dict]]" = OrderedDict()
+
+        self.rows_frame.bind("<Configure>", lambda event: self._render())
+        self._bind_wheel(self, self.rows_frame, self.empty_label)
+
+    def _bind_wheel(self, *widgets):
+        """鼠标滚轮：Windows/macOS 为 <MouseWheel>，Linux 为 <Button-4>/<Button-5>"""
+        for widget in widgets:
+            widget.bind("<MouseWheel>", self._on_mousewheel)
+            widget.bind("<Button-4>", lambda event: self.scroll_by(-1))
+            widget.bind("<Button-5>", lambda event: self.scroll_by(1))
+
+    def set_source(self, total: int, fetch: Callable[[int, int], List[Dict]]):
+        """
+        设置数据源并回到顶部
+        :param total: 记录总数
+        :param fetch: fetch(offset, limit) 返回一页记录
+        """
+        self.total = total
+        self._fetch = fetch
+        self._pages.clear()
+        self.first = 0
+        self._render()
+
+    @property
+    def visible_count(self) -> int:
+        """当前高度能显示的行数"""
+        return max(1, self.rows_frame.winfo_height() // self.ROW_HEIGHT)
+
+    def _record(self, index: int) -> Dict:
+        page_no = index // self.PAGE_SIZE
+        if page_no in self._pages:
+            self._pages.move_to_end(page_no)
+        else:
+            self._pages[page_no] = self._fetch(page_no * self.PAGE_SIZE, self.PAGE_SIZE)
+            while len(self._pages) > self.MAX_PAGES:
+                self._pages.popitem(last=False)
+        page = self._pages[page_no]
+        offset = index % self.PAGE_SIZE
+        return page[offset] if offset < len(page) else None
+
+    def _render(self):
+        if self.total == 0:
+            for row in self.rows:
+                row.frame.pack_forget()
+            self.empty_label.pack(pady=10)
+            self.scrollbar.set(0, 1)
+            return
+        self.empty_label.pack_forget()
+
+        count = min(self.visible_count, self.total)
+        self.first = max(0, min(self.first, self.total - count))
+
+        # 只在可见行数增加时创建新的行控件
+        while len(self.rows) < count:
+            row = HistoryRow(self.rows_frame, self.ROW_HEIGHT - 6)
+            self._bind_wheel(row.frame, row.goal_label, row.time_label, row.duration_label)
+            self.rows.append(row)
+
+        for i, row in enumerate(self.rows):
+            record = self._record(self.first + i) if i < count else None
+            if record is None:
+                row.frame.pack_forget()
+                continue
+            row.show(record)
+            if not row.frame.winfo_manager():
+                row.frame.pack(fill="x", pady=3, padx=5)
+
+        self.scrollbar.set(self.first / self.total, (self.first + count) / self.total)
+
+    def scroll_by(self, rows: int):
+        """
+        滚动若干行
+        :param rows: 行数，负数向上
+        """
+        self.scroll_to(self.first + rows)
+
+    def scroll_to(self, index: int):
+        """
+        滚动到某一行
+        :param index: 行序号
+        """
+        index = max(0, min(index, self.total - self.visible_count))
+        if index != self.first:
+            self.first = index
+            self._render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self.total))
+        elif action == "scroll":
+            step = self.visible_count if unit == "pages" else 1
+            self.scroll_by(int(value) * step)
+
+    def _on_mousewheel(self, event):
+        self.scroll_by(-1 if event.delta > 0 else 1)
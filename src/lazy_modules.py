@@ -0,0 +1,52 @@
+"""
+按需加载的重量级依赖
+OpenCV、pygame/SDL 音频和系统通知只在第一次真正用到时才导入和初始化，
+大多数用户从不使用视频模式，不必在每次启动时为它们付出代价
+"""
+import sys
+import time
+import logging
+import importlib
+import threading
+
+_lock = threading.Lock()
+
+
+def _load(name: str):
+    """导入模块，首次导入时把耗时写入日志"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with _lock:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        logging.info(f"按需加载 {name}: {(time.perf_counter() - start) * 1000:.1f} ms")
+        return module
+
+
+def get_video_pipeline():
+    """
+    获取视频解码模块，首次调用时才导入 OpenCV
+    """
+    return _load("src.video_pipeline")
+
+
+def get_mixer():
+    """
+    获取已初始化的 pygame.mixer，首次调用时导入 pygame 并初始化 SDL 音频
+    """
+    pygame = _load("pygame")
+    with _lock:
+        if not pygame.mixer.get_init():
+            start = time.perf_counter()
+            pygame.mixer.init()
+            logging.info(f"初始化音频混音器: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return pygame.mixer
+
+
+def notify(**kwargs):
+    """
+    显示系统通知，首次调用时导入 plyer
+    :param kwargs: 传给 plyer.notification.notify 的参数
+    """
+    _load("plyer").notification.notify(**kwargs)
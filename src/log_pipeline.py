@@ -0,0 +1,106 @@
+"""
+异步日志
+日志调用只把记录放进内存队列，由后台 QueueListener 线程写入按大小轮转的日志文件，
+Tk 线程不会因为磁盘 I/O 而卡顿；级别和轮转参数来自 debug_config.json
+"""
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Optional
+
+DEFAULT_DEBUG_CONFIG = {
+    "debug": False,  # true 时记录 DEBUG 级别日志
+    "log_level": None,  # 显式指定级别（DEBUG/INFO/WARNING/ERROR），优先于 debug
+    "log_file": "debug.log",
+    "log_max_bytes": 2 * 1024 * 1024,  # 单个日志文件上限
+    "log_backup_count": 3,  # 保留的旧日志文件数
+}
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener: Optional[QueueListener] = None
+
+
+def load_debug_config(search_dirs: List[str]) -> Dict:
+    """
+    读取 debug_config.json，按顺序在各目录中查找，找不到时使用默认值
+    :param search_dirs: 候选目录
+    :return: 调试配置
+    """
+    config = dict(DEFAULT_DEBUG_CONFIG)
+    for directory in search_dirs:
+        path = os.path.join(directory, "debug_config.json")
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                config.update(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"读取调试配置失败 {path}: {str(e)}")
+        break
+    return config
+
+
+def resolve_level(config: Dict) -> int:
+    """
+    根据调试配置确定日志级别
+    :param config: 调试配置
+    :return: logging 级别
+    """
+    level = config.get("log_level")
+    if isinstance(level, str) and isinstance(logging.getLevelName(level.upper()), int):
+        return logging.getLevelName(level.upper())
+    return logging.DEBUG if config.get("debug") else logging.INFO
+
+
+def setup_logging(application_path: str) -> Dict:
+    """
+    配置根日志：QueueHandler 入队，后台线程写入轮转文件；重复调用不会重复配置
+    :param application_path: 程序运行路径，日志文件的相对路径以它为基准
+    :return: 使用的调试配置
+    """
+    global _listener
+    search_dirs = [application_path, getattr(sys, "_MEIPASS", None), os.getcwd()]
+    config = load_debug_config([d for d in search_dirs if d])
+    if _listener is not None:
+        return config
+
+    log_file = config.get("log_file") or DEFAULT_DEBUG_CONFIG["log_file"]
+    if not os.path.isabs(log_file):
+        log_file = os.path.join(application_path, log_file)
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=config.get("log_max_bytes", DEFAULT_DEBUG_CONFIG["log_max_bytes"]),
+        backupCount=config.get("log_backup_count", DEFAULT_DEBUG_CONFIG["log_backup_count"]),
+        encoding="utf-8",
+        delay=True
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    # 队列不设上限：日志调用永远不会阻塞
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(resolve_level(config))
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    # 退出时写完队列中剩余的日志
+    atexit.register(shutdown_logging)
+    return config
+
+
+def shutdown_logging():
+    """停止后台写日志线程，队列中剩余的记录会先写完"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -0,0 +1,314 @@
+"""
+动画文件夹的媒体目录与轮换
+目录在后台线程中建立一次索引（类型、尺寸、帧数、时长），之后轮询文件夹的变化增量更新；
+每次休息选取媒体只查内存中的表，不扫描文件夹
+"""
+import os
+import json
+import random
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+from src.media_prefetch import ANIMATION_EXTENSIONS, pick_animation_file
+
+ROTATION_MODES = ("first", "shuffle", "round_robin", "weighted")
+
+
+def read_media_info(path: str) -> Dict:
+    """
+    读取图片/GIF 的元数据
+    :param path: 文件路径
+    :return: {"type", "width", "height", "frames", "duration_ms"}
+    """
+    from PIL import Image
+
+    with Image.open(path) as img:
+        info = {"type": "gif" if path.lower().endswith(".gif") else "image",
+                "width": img.size[0], "height": img.size[1],
+                "frames": getattr(img, "n_frames", 1), "duration_ms": None}
+        if info["frames"] > 1:
+            duration = 0
+            for index in range(info["frames"]):
+                img.seek(index)
+                duration += int(img.info.get("duration") or 0)
+            info["duration_ms"] = duration
+    return info
+
+
+class MediaCatalog:
+    """
+    一个动画文件夹的索引
+    后台线程每隔 poll_interval 秒检查文件夹的修改时间，有文件增删时重新列目录；
+    每隔 full_scan_every 次检查还会逐个比较文件的修改时间和大小，发现被覆盖的文件。
+    只有新增或改变的文件才读取元数据，索引保存在缓存目录中，重启后不必重读
+    """
+
+    def __init__(self, folder: str, cache_dir: str = os.path.join("cache", "catalog"),
+                 poll_interval: float = 5.0, full_scan_every: int = 12):
+        """
+        :param folder: 动画文件夹
+        :param cache_dir: 索引缓存目录
+        :param poll_interval: 轮询间隔（秒）
+        :param full_scan_every: 每多少次轮询做一次逐文件检查
+        """
+        self.folder = os.path.abspath(folder)
+        self.poll_interval = poll_interval
+        self.full_scan_every = full_scan_every
+        os.makedirs(cache_dir, exist_ok=True)
+        folder_hash = hashlib.sha1(self.folder.encode("utf-8")).hexdigest()[:16]
+        self.index_path = os.path.join(cache_dir, f"{folder_hash}.json")
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = self._load_index()
+        # 排好序的文件名，轮换按这个顺序
+        self.names: List[str] = sorted(self._entries)
+        # 每次内容变化加一，轮换据此重建内部结构
+        self.version = 0
+        self.ready = threading.Event()
+        self._folder_mtime = None
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="MediaCatalog", daemon=True)
+
+    def _load_index(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"读取媒体目录索引失败，将重新建立: {str(e)}")
+            return {}
+        return data.get("entries", {}) if data.get("folder") == self.folder else {}
+
+    def _save_index(self):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.index_path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"folder": self.folder, "entries": self._entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def start(self):
+        """在后台建立索引并开始监视文件夹"""
+        self._thread.start()
+
+    def stop(self):
+        """停止监视"""
+        self._stop_event.set()
+
+    def _watch(self):
+        polls = 0
+        self.scan(full=True)
+        self.ready.set()
+        while not self._stop_event.wait(self.poll_interval):
+            polls += 1
+            try:
+                folder_mtime = os.stat(self.folder).st_mtime_ns
+            except OSError:
+                folder_mtime = None
+            full = polls % self.full_scan_every == 0
+            if full or folder_mtime != self._folder_mtime:
+                self.scan(full=full)
+
+    def scan(self, full: bool = True):
+        """
+        同步扫描文件夹并更新索引
+        :param full: 是否逐个检查已知文件的修改时间和大小（否则只处理增删）
+        """
+        try:
+            self._folder_mtime = os.stat(self.folder).st_mtime_ns
+            found = {entry.name: entry for entry in os.scandir(self.folder)
+                     if entry.is_file() and entry.name.endswith(ANIMATION_EXTENSIONS)}
+        except OSError:
+            found = {}
+
+        entries = dict(self._entries)
+        changed = False
+        for name in [name for name in entries if name not in found]:
+            del entries[name]
+            changed = True
+        for name, dir_entry in found.items():
+            known = entries.get(name)
+            if known is not None and not full:
+                continue
+            stat = dir_entry.stat()
+            if known is not None and known["mtime"] == stat.st_mtime_ns and known["size"] == stat.st_size:
+                continue
+            try:
+                info = read_media_info(dir_entry.path)
+            except Exception as e:
+                logging.warning(f"无法读取媒体文件 {dir_entry.path}: {str(e)}")
+                continue
+            info.update(mtime=stat.st_mtime_ns, size=stat.st_size)
+            entries[name] = info
+            changed = True
+
+        if not changed:
+            return
+        with self._lock:
+            self._entries = entries
+            self.names = sorted(entries)
+            self.version += 1
+        try:
+            self._save_index()
+        except OSError as e:
+            logging.warning(f"保存媒体目录索引失败: {str(e)}")
+        logging.info(f"媒体目录已更新: {self.folder}, {len(entries)} 个文件")
+
+    def info(self, name: str) -> Optional[Dict]:
+        """
+        某个文件的元数据
+        :param name: 文件名
+        """
+        return self._entries.get(name)
+
+    def path(self, name: str) -> str:
+        """
+        文件的完整路径
+        :param name: 文件名
+        """
+        return os.path.join(self.folder, name)
+
+
+class MediaRotation:
+    """
+    在媒体目录上按策略轮换，每次选取 O(1)：
+    first：与以前一样，总是第一个 GIF，没有 GIF 时第一张图片；
+    shuffle：洗牌后依次播放，一轮放完再洗，不会连续重复；
+    round_robin：按文件名顺序依次播放；
+    weighted：按权重随机（别名法），未指定权重的文件权重为 1
+    """
+
+    def __init__(self, catalog: MediaCatalog, mode: str = "first", weights: Optional[Dict[str, float]] = None):
+        """
+        :param catalog: 媒体目录
+        :param mode: 轮换方式
+        :param weights: weighted 模式下 文件名 -> 权重
+        """
+        self.catalog = catalog
+        self.mode = mode if mode in ROTATION_MODES else "first"
+        self.weights = weights or {}
+        self._lock = threading.Lock()
+        self._version = None
+        self._names: List[str] = []
+        self._bag: List[str] = []
+        self._cursor = 0
+        self._alias_prob: List[float] = []
+        self._alias: List[int] = []
+        self._first: Optional[str] = None
+        self._next: Optional[str] = None
+
+    def _rebuild(self):
+        """目录变化后重建内部结构，耗时 O(n)，只在变化后的第一次选取时发生"""
+        last = self._names[self._cursor - 1] if self._names and self._cursor else None
+        self._names = list(self.catalog.names)
+        self._version = self.catalog.version
+        self._bag = []
+        if self._next not in self._names:
+            self._next = None
+        # 轮询位置尽量接在上次播放的文件之后
+        self._cursor = self._names.index(last) + 1 if last in self._names else 0
+        self._first = next((name for name in self._names if name.lower().endswith(".gif")),
+                           self._names[0] if self._names else None)
+        if self.mode == "weighted":
+            self._build_alias([max(0.0, float(self.weights.get(name, 1))) for name in self._names])
+
+    def _build_alias(self, weights: List[float]):
+        """Walker 别名法：O(n) 建表，O(1) 抽样"""
+        n = len(weights)
+        total = sum(weights)
+        if n == 0 or total <= 0:
+            self._alias_prob, self._alias = [1.0] * n, list(range(n))
+            return
+        scaled = [w * n / total for w in weights]
+        self._alias_prob, self._alias = [0.0] * n, [0] * n
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self._alias_prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+        for i in small + large:
+            self._alias_prob[i] = 1.0
+            self._alias[i] = i
+
+    def _choose(self) -> Optional[str]:
+        names = self._names
+        if not names:
+            return None
+        if self.mode == "shuffle":
+            if not self._bag:
+                self._bag = list(names)
+                random.shuffle(self._bag)
+            return self._bag.pop()
+        if self.mode == "round_robin":
+            name = names[self._cursor % len(names)]
+            self._cursor = self._cursor % len(names) + 1
+            return name
+        if self.mode == "weighted":
+            i = random.randrange(len(names))
+            return names[i] if random.random() < self._alias_prob[i] else names[self._alias[i]]
+        return self._first
+
+    def peek(self) -> Optional[str]:
+        """
+        下一次将要播放的文件（不前进），用于提前准备代理
+        :return: 文件路径，目录为空时返回 None
+        """
+        with self._lock:
+            if self._version != self.catalog.version:
+                self._rebuild()
+            if self._next is None:
+                self._next = self._choose()
+            return self.catalog.path(self._next) if self._next else None
+
+    def pick(self) -> Optional[str]:
+        """
+        选出本次休息播放的文件并前进
+        :return: 文件路径，目录为空时返回 None
+        """
+        path = self.peek()
+        with self._lock:
+            self._next = None
+        return path
+
+
+def create_rotation(folder: str, mode: str, weights: Optional[Dict[str, float]] = None) -> MediaRotation:
+    """
+    为文件夹建立媒体目录并开始监视
+    :param folder: 动画文件夹
+    :param mode: 轮换方式
+    :param weights: weighted 模式的权重
+    :return: 媒体轮换
+    """
+    catalog = MediaCatalog(folder)
+    catalog.start()
+    return MediaRotation(catalog, mode, weights)
+
+
+def _usable(rotation: Optional[MediaRotation], folder: str) -> bool:
+    return rotation is not None and rotation.catalog.ready.is_set() \
+        and rotation.catalog.folder == os.path.abspath(folder)
+
+
+def pick_from(rotation: Optional[MediaRotation], folder: str) -> Optional[str]:
+    """
+    选取本次休息的动画文件并前进轮换；目录尚未建好时退回直接扫描文件夹
+    :param rotation: 媒体轮换
+    :param folder: 动画文件夹
+    :return: 文件路径或 None
+    """
+    return rotation.pick() if _usable(rotation, folder) else pick_animation_file(folder)
+
+
+def peek_from(rotation: Optional[MediaRotation], folder: str) -> Optional[str]:
+    """
+    下一次休息将要播放的动画文件，不前进轮换，用于预加载和生成代理
+    :param rotation: 媒体轮换
+    :param folder: 动画文件夹
+    :return: 文件路径或 None
+    """
+    return rotation.peek() if _usable(rotation, folder) else pick_animation_file(folder)
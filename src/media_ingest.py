@@ -0,0 +1,212 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Set
+
+from src.lazy_modules import get_video_pipeline
+
+# 计算内容指纹时读取的头尾字节数
+HASH_SAMPLE_BYTES = 1024 * 1024
+
+
+def file_fingerprint(path: str) -> str:
+    """
+    视频文件的内容指纹：文件大小 + 头尾各 1MB 的 SHA-1
+    对几百 MB 的视频也只需读取 2MB，文件被替换或重新编码后指纹会改变
+    :param path: 文件路径
+    :return: 十六进制字符串
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(HASH_SAMPLE_BYTES))
+        if size > 2 * HASH_SAMPLE_BYTES:
+            f.seek(-HASH_SAMPLE_BYTES, os.SEEK_END)
+            digest.update(f.read(HASH_SAMPLE_BYTES))
+    return digest.hexdigest()
+
+
+def extract_audio(video_file: str, output_file: str,
+                  on_start: Optional[Callable[[subprocess.Popen], None]] = None) -> bool:
+    """
+    用 ffmpeg 把视频的音轨提取为 OGG
+    :param video_file: 视频文件路径
+    :param output_file: 输出的 .ogg 路径
+    :param on_start: ffmpeg 进程启动后以该进程调用，调用方可借此在退出时结束它
+    :return: 是否成功；没有 ffmpeg、视频没有音轨或 ffmpeg 被结束时返回 False
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        logging.warning("未找到 ffmpeg，视频将无声播放")
+        return False
+    directory = os.path.dirname(output_file)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".ogg")
+    os.close(fd)
+    try:
+        process = subprocess.Popen(
+            [ffmpeg, "-nostdin", "-y", "-loglevel", "error", "-i", video_file,
+             "-vn", "-acodec", "libvorbis", "-q:a", "4", tmp_path],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            # 打包后的窗口程序调用 ffmpeg 时不弹出控制台窗口
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        )
+        if on_start is not None:
+            on_start(process)
+        _, stderr = process.communicate()
+        if process.returncode != 0 or os.path.getsize(tmp_path) == 0:
+            logging.warning(f"提取音轨失败（视频可能没有声音）: {video_file}: "
+                            f"{stderr.decode('utf-8', 'replace').strip()}")
+            return False
+        os.replace(tmp_path, output_file)
+        return True
+    except OSError as e:
+        logging.error(f"运行 ffmpeg 失败: {str(e)}")
+        return False
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class MediaIngest:
+    """
+    视频导入缓存
+    选择视频时在后台提取一次音轨、读取一次元数据，按内容指纹保存在缓存目录中；
+    休息开始时只需按 路径 + 修改时间 + 大小 查表，直接打开提取好的音频，不再探测视频容器
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: str = os.path.join("cache", "media")):
+        """
+        :param cache_dir: 缓存目录
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index_path = os.path.join(cache_dir, self.INDEX_FILE)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="MediaIngest")
+        self._pending: Dict[str, Future] = {}
+        # 正在运行的 ffmpeg 进程，退出时结束
+        self._processes: Set[subprocess.Popen] = set()
+        self._closed = False
+        self._index = self._load_index()
+
+    def _load_index(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"读取媒体缓存索引失败，将重新导入: {str(e)}")
+            return {}
+
+    def _save_index(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def _stat_key(path: str) -> Dict:
+        stat = os.stat(path)
+        return {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+
+    def lookup(self, video_file: str) -> Optional[Dict]:
+        """
+        查找已导入的视频信息，不读取视频内容
+        :param video_file: 视频文件路径
+        :return: {"fps", "width", "height", "frame_count", "duration", "audio_file"}，未导入或文件已改变时返回 None
+        """
+        path = os.path.abspath(video_file)
+        with self._lock:
+            entry = self._index.get(path)
+        if entry is None or not os.path.exists(path) or entry["stat"] != self._stat_key(path):
+            return None
+        info = entry["info"]
+        if info.get("audio_file") and not os.path.exists(info["audio_file"]):
+            return None
+        return info
+
+    def ingest(self, video_file: str) -> Optional[Dict]:
+        """
+        导入视频：读取元数据并提取音轨，已导入且未改变时直接返回缓存
+        :param video_file: 视频文件路径
+        :return: 视频信息，无法打开时返回 None
+        """
+        info = self.lookup(video_file)
+        if info is not None:
+            return info
+
+        path = os.path.abspath(video_file)
+        stat_key = self._stat_key(path)
+        fingerprint = file_fingerprint(path)
+        info_path = os.path.join(self.cache_dir, f"{fingerprint}.json")
+
+        # 同样内容的文件（例如改名或复制）已导入过
+        if os.path.exists(info_path):
+            with open(info_path, "r", encoding="utf-8") as f:
+                info = json.load(f)
+            if info.get("audio_file") and not os.path.exists(info["audio_file"]):
+                info = None
+        if info is None:
+            info = get_video_pipeline().probe_video(path)
+            if info is None:
+                logging.error(f"无法读取视频元数据: {path}")
+                return None
+            audio_path = os.path.join(self.cache_dir, f"{fingerprint}.ogg")
+            extracted = extract_audio(path, audio_path, self._track)
+            if self._closed:
+                # 提取被退出打断，不把“没有音轨”记入缓存
+                return None
+            info["audio_file"] = audio_path if extracted else None
+            with open(info_path, "w", encoding="utf-8") as f:
+                json.dump(info, f, ensure_ascii=False, indent=2)
+            logging.info(f"已导入视频 {path}: {info}")
+
+        with self._lock:
+            self._index[path] = {"stat": stat_key, "fingerprint": fingerprint, "info": info}
+            self._save_index()
+        return info
+
+    def ingest_async(self, video_file: str) -> Future:
+        """
+        在后台线程中导入视频，同一文件不会重复提交
+        :param video_file: 视频文件路径
+        :return: 结果为视频信息的 Future
+        """
+        path = os.path.abspath(video_file)
+        with self._lock:
+            if path in self._pending:
+                return self._pending[path]
+            future = self._executor.submit(self.ingest, path)
+            self._pending[path] = future
+        future.add_done_callback(lambda _: self._pending.pop(path, None))
+        return future
+
+    def _track(self, process: subprocess.Popen):
+        """记录启动的 ffmpeg 进程并丢掉已结束的；已经在退出时直接结束它"""
+        with self._lock:
+            if not self._closed:
+                self._processes = {p for p in self._processes if p.poll() is None}
+                self._processes.add(process)
+                return
+        process.kill()
+
+    def shutdown(self):
+        """退出时调用：取消排队的导入，结束正在运行的 ffmpeg，不等待它完成"""
+        with self._lock:
+            self._closed = True
+            processes = list(self._processes)
+            self._processes.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.poll() is None:
+                logging.info("退出时结束正在提取音轨的 ffmpeg")
+                process.kill()
@@ -0,0 +1,165 @@
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from src.gif_cache import GifFrameCache
+from src.lazy_modules import get_video_pipeline
+
+ANIMATION_EXTENSIONS = ('.gif', '.png', '.jpg', '.jpeg')
+
+
+def pick_animation_file(folder: str) -> Optional[str]:
+    """
+    选择动画文件夹中要显示的文件：优先第一个 GIF，否则第一张图片
+    :param folder: 动画文件夹
+    :return: 文件路径，没有可用文件时返回 None
+    """
+    if not os.path.exists(folder):
+        return None
+    animation_files = [f for f in os.listdir(folder) if f.endswith(ANIMATION_EXTENSIONS)]
+    if not animation_files:
+        return None
+    gif_files = [f for f in animation_files if f.endswith('.gif')]
+    return os.path.join(folder, gif_files[0] if gif_files else animation_files[0])
+
+
+class PreparedMedia:
+    """预加载好的休息媒体，休息窗口只需直接使用"""
+
+    def __init__(self, key: tuple):
+        """
+        :param key: 生成时的媒体配置，用于判断配置是否已经改变
+        """
+        self.key = key
+        self.animation_path = None
+        self.gif_frames = None
+        self.video_decoder = None
+
+    def release(self):
+        """释放未被使用的资源"""
+        if self.video_decoder is not None:
+            self.video_decoder.stop()
+            self.video_decoder = None
+
+
+class MediaPrefetcher:
+    """
+    在休息开始前的若干秒，于后台线程中加载并解码休息媒体
+    gif：解码并按窗口大小重采样到 GIF 缓存；video：打开文件并开始解码首批帧；
+    提示音：交给音频引擎预先解码；背景音乐由音频引擎边读边播，无需预加载
+    """
+
+    def __init__(self, gif_cache: GifFrameCache, audio_engine=None, media_ingest=None, proxy_cache=None,
+                 animation_picker: Callable[[str], Optional[str]] = pick_animation_file):
+        """
+        :param gif_cache: 共享的 GIF 帧缓存
+        :param audio_engine: 音频引擎，用于预先解码提示音
+        :param media_ingest: 视频导入缓存，提供已读取的视频元数据
+        :param proxy_cache: 代理缓存，有显示尺寸的视频代理时解码代理
+        :param animation_picker: animation_picker(文件夹) 返回下一次休息将要播放的动画文件，不得前进轮换：
+                                 预加载的结果可能被丢弃，真正开始休息时才选定文件
+        """
+        self.gif_cache = gif_cache
+        self.animation_picker = animation_picker
+        self.audio_engine = audio_engine
+        self.media_ingest = media_ingest
+        self.proxy_cache = proxy_cache
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="MediaPrefetch")
+        self._lock = threading.Lock()
+        self._future = None
+
+    @staticmethod
+    def media_key(config: Dict, area: Tuple[int, int]) -> tuple:
+        """
+        影响预加载结果的配置项
+        :param config: 应用配置
+        :param area: 媒体显示区域
+        """
+        return (config.get("media_type", "gif"), config.get("animation_folder"), config.get("video_file"),
+                config.get("music_file"), config.get("sound_enabled"), config.get("sound_file"), area)
+
+    @property
+    def pending(self) -> bool:
+        """是否已经有预加载任务或结果"""
+        return self._future is not None
+
+    def prefetch(self, config: Dict, area: Tuple[int, int]):
+        """
+        开始后台预加载，已有任务时不重复启动
+        :param config: 应用配置
+        :param area: 媒体显示区域
+        """
+        with self._lock:
+            if self._future is not None:
+                return
+            key = self.media_key(config, area)
+            logging.info(f"开始预加载休息媒体: {key[0]}")
+            self._future = self._executor.submit(self._load, dict(config), area, key)
+
+    def _load(self, config: Dict, area: Tuple[int, int], key: tuple) -> PreparedMedia:
+        prepared = PreparedMedia(key)
+        media_type = config.get("media_type", "gif")
+
+        if (self.audio_engine is not None and media_type != "music" and config.get("sound_enabled")
+                and os.path.exists(config.get("sound_file", ""))):
+            self.audio_engine.preload_cue(config["sound_file"])
+
+        if media_type == "gif":
+            prepared.animation_path = self.animation_picker(config.get("animation_folder", "animations"))
+            if prepared.animation_path and prepared.animation_path.endswith('.gif'):
+                prepared.gif_frames = self.gif_cache.get(prepared.animation_path, area)
+        elif media_type == "video" and os.path.exists(config.get("video_file", "")):
+            # 只有视频模式才需要 OpenCV
+            source = config["video_file"]
+            info = self.media_ingest.lookup(source) if self.media_ingest is not None else None
+            if self.proxy_cache is not None:
+                source, info = self.proxy_cache.video_source(source, area, info)
+            decoder = get_video_pipeline().VideoDecoder(source, info=info)
+            if decoder.is_opened():
+                decoder.fit_to(*area)
+                decoder.start()
+                prepared.video_decoder = decoder
+            else:
+                decoder.stop()
+
+        logging.info("休息媒体预加载完成")
+        return prepared
+
+    def take(self, config: Dict, area: Tuple[int, int]) -> Optional[PreparedMedia]:
+        """
+        取出预加载结果；尚未完成、失败或配置已改变时返回 None，由调用方走同步加载
+        :param config: 当前应用配置
+        :param area: 当前媒体显示区域
+        :return: 预加载好的媒体或 None
+        """
+        with self._lock:
+            future, self._future = self._future, None
+        if future is None:
+            return None
+        if not future.done():
+            # 来不及了，完成后直接丢弃
+            future.add_done_callback(self._discard)
+            return None
+        try:
+            prepared = future.result()
+        except Exception as e:
+            logging.error(f"预加载休息媒体失败: {str(e)}")
+            return None
+        if prepared.key != self.media_key(config, area):
+            prepared.release()
+            return None
+        return prepared
+
+    def cancel(self):
+        """取消并丢弃预加载结果"""
+        with self._lock:
+            future, self._future = self._future, None
+        if future is not None:
+            future.add_done_callback(self._discard)
+
+    @staticmethod
+    def _discard(future):
+        if not future.cancelled() and future.exception() is None:
+            future.result().release()
@@ -0,0 +1,238 @@
+"""
+轻量的运行指标
+计数器与直方图都只在内存中累加，记录一次只需一次加锁和几次加法；
+可定期写入 JSON 文件，或在本机端口上按连接返回 JSON 快照，便于统一采集
+"""
+import os
+import json
+import time
+import bisect
+import logging
+import tempfile
+import threading
+import socketserver
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# 直方图桶的上界（毫秒）
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class Counter:
+    """单调递增的计数器"""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        """
+        增加计数
+        :param amount: 增量
+        """
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> int:
+        return self.value
+
+
+class Histogram:
+    """按固定桶统计的直方图，另外记录次数、总和、最小与最大值"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS):
+        """
+        :param buckets: 升序的桶上界，超过最后一个上界的值计入溢出桶
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """
+        记录一个值
+        :param value: 取值（毫秒）
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        按桶估算分位数，返回所在桶的上界（溢出桶返回最大值）
+        :param q: 0~1
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "sum": round(self.total, 3),
+                "min": self.min,
+                "max": self.max,
+                "mean": round(self.total / self.count, 3) if self.count else None,
+                "p50": self.quantile(0.5),
+                "p95": self.quantile(0.95),
+                "p99": self.quantile(0.99),
+                "buckets": {str(bound): count for bound, count in zip(self.buckets + ("inf",), self.counts)},
+            }
+
+
+class MetricsRegistry:
+    """按名称管理计数器和直方图"""
+
+    def __init__(self):
+        self.started = time.time()
+        self._counters: Dict[str, Counter] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._dump_stop = None
+        self._server = None
+
+    def counter(self, name: str) -> Counter:
+        """
+        获取计数器，不存在时创建
+        :param name: 指标名
+        """
+        counter = self._counters.get(name)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(name, Counter())
+        return counter
+
+    def histogram(self, name: str) -> Histogram:
+        """
+        获取直方图，不存在时创建
+        :param name: 指标名
+        """
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        return histogram
+
+    def observe(self, name: str, value_ms: float):
+        """
+        向直方图记录一个值
+        :param name: 指标名
+        :param value_ms: 毫秒数
+        """
+        self.histogram(name).observe(value_ms)
+
+    @contextmanager
+    def timer(self, name: str):
+        """
+        计时一段代码，耗时（毫秒）记入直方图
+        :param name: 指标名
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name).observe((time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> Dict:
+        """
+        当前全部指标
+        :return: {"pid", "started", "time", "counters", "histograms"}
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = dict(self._histograms)
+        return {
+            "pid": os.getpid(),
+            "started": self.started,
+            "time": time.time(),
+            "counters": {name: counter.snapshot() for name, counter in sorted(counters.items())},
+            "histograms": {name: histogram.snapshot() for name, histogram in sorted(histograms.items())},
+        }
+
+    def dump(self, path: str) -> bool:
+        """
+        把快照原子地写入 JSON 文件
+        :param path: 文件路径
+        :return: 是否成功
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logging.error(f"写入运行指标失败: {str(e)}")
+            return False
+
+    def start_dumping(self, path: str, interval: float = 60.0):
+        """
+        在后台线程中定期写入指标文件
+        :param path: 文件路径
+        :param interval: 间隔（秒）
+        """
+        if self._dump_stop is not None:
+            return
+        self._dump_stop = threading.Event()
+        stop = self._dump_stop
+
+        def loop():
+            while not stop.wait(interval):
+                self.dump(path)
+
+        threading.Thread(target=loop, name="MetricsDump", daemon=True).start()
+        logging.info(f"运行指标每 {interval} 秒写入 {path}")
+
+    def serve(self, port: int):
+        """
+        在 127.0.0.1 上监听端口，每个连接返回一份 JSON 快照后关闭
+        :param port: 端口号
+        """
+        if self._server is not None:
+            return
+        registry = self
+
+        class SnapshotHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                self.request.sendall(json.dumps(registry.snapshot(), ensure_ascii=False).encode("utf-8") + b"\n")
+
+        try:
+            self._server = socketserver.ThreadingTCPServer(("127.0.0.1", port), SnapshotHandler)
+        except OSError as e:
+            logging.error(f"运行指标端口 {port} 监听失败: {str(e)}")
+            return
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True).start()
+        logging.info(f"运行指标可通过 127.0.0.1:{port} 读取")
+
+    def stop(self):
+        """停止定期写入和端口监听"""
+        if self._dump_stop is not None:
+            self._dump_stop.set()
+            self._dump_stop = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# 进程内唯一的指标注册表，解码线程等非界面代码也直接使用它
+metrics = MetricsRegistry()
@@ -0,0 +1,354 @@
+"""
+显示尺寸的媒体代理缓存
+4K 视频和超大 GIF 每次播放都要逐帧缩小到屏幕的 80%，
+这里由后台工作进程预先转出与显示区域一样大的代理文件，播放时透明地改读代理：
+视频转为低分辨率视频，GIF 转为重采样后的帧表（不压缩的 zip，内含每帧 PNG 和时长）。
+源文件的修改时间或大小改变后代理失效，总大小超过上限时淘汰最久未用的代理
+"""
+import os
+import json
+import time
+import queue
+import zipfile
+import hashlib
+import logging
+import tempfile
+import threading
+import multiprocessing
+from typing import Dict, Optional, Set, Tuple
+
+from src.gif_cache import GifFrames, decode_gif, fit_size
+
+VIDEO = "video"
+GIF = "gif"
+
+
+# ---- 在工作进程中执行的转换函数，必须是模块级函数 ----
+
+def build_video_proxy(source: str, target: str, box: Tuple[int, int]) -> Optional[Dict]:
+    """
+    把视频缩小到 box 内，视频本来就不大于 box 时不生成代理
+    :param source: 源视频
+    :param target: 代理文件路径（.mp4）
+    :param box: 显示区域
+    :return: 代理的元数据 {"fps", "width", "height", "frame_count", "duration"}，无需代理时返回 None
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(source)
+    try:
+        if not cap.isOpened():
+            raise IOError(f"无法打开视频: {source}")
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25
+        if width <= box[0] and height <= box[1]:
+            return None
+        # 编码器要求偶数尺寸
+        size = tuple(max(2, v - v % 2) for v in fit_size((width, height), box))
+        writer = cv2.VideoWriter(target, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+        if not writer.isOpened():
+            # 没有 mp4v 编码器的 OpenCV 打不开写入器，之后的 write 都不会写出任何东西
+            raise IOError(f"无法创建代理视频: {target}")
+        frame_count = 0
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                # 离线转换，用质量更好的 INTER_AREA
+                writer.write(cv2.resize(frame, size, interpolation=cv2.INTER_AREA))
+                frame_count += 1
+        finally:
+            writer.release()
+    finally:
+        cap.release()
+    if frame_count == 0:
+        raise IOError(f"没有读出任何帧: {source}")
+    return {"fps": fps, "width": size[0], "height": size[1], "frame_count": frame_count,
+            "duration": frame_count / fps if frame_count else None}
+
+
+def build_gif_proxy(source: str, target: str, box: Tuple[int, int]) -> Optional[Dict]:
+    """
+    把 GIF 重采样到 box 内并保存为帧表，GIF 本来就不大于 box 时不生成代理
+    :param source: 源 GIF
+    :param target: 代理文件路径（.zip）
+    :param box: 显示区域
+    :return: {"width", "height", "frames"}，无需代理时返回 None
+    """
+    from PIL import Image
+
+    with Image.open(source) as gif:
+        if gif.size[0] <= box[0] and gif.size[1] <= box[1]:
+            return None
+    frames = decode_gif(source, box)
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_STORED) as sheet:
+        sheet.writestr("meta.json", json.dumps({"size": frames.size, "durations": frames.durations}))
+        for index, data in enumerate(frames.frames):
+            sheet.writestr(f"{index:05d}.png", data)
+    return {"width": frames.size[0], "height": frames.size[1], "frames": len(frames)}
+
+
+def load_gif_proxy(path: str) -> GifFrames:
+    """
+    读取 GIF 帧表
+    :param path: 代理文件路径
+    :return: 帧数据
+    """
+    with zipfile.ZipFile(path) as sheet:
+        meta = json.loads(sheet.read("meta.json"))
+        names = sorted(name for name in sheet.namelist() if name.endswith(".png"))
+        frames = [sheet.read(name) for name in names]
+    return GifFrames(frames, tuple(meta["size"]), meta["durations"])
+
+
+BUILDERS = {VIDEO: (build_video_proxy, ".mp4"), GIF: (build_gif_proxy, ".zip")}
+
+
+def run_builder(kind: str, source: str, target: str, box: Tuple[int, int], conn):
+    """
+    工作进程的入口：执行转换并把 (是否成功, 元数据或错误信息) 发回主进程
+    :param conn: 管道的发送端
+    """
+    try:
+        conn.send((True, BUILDERS[kind][0](source, target, box)))
+    except Exception as e:
+        conn.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+class ProxyCache:
+    """
+    代理文件的索引、后台生成与 LRU 淘汰，只在主进程中使用
+    每个代理在单独的 spawn 子进程中生成，一次一个：不在带着 Tk、音频等线程的进程中 fork，
+    退出时可以直接结束正在转换的子进程，不必等它完成
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: str = os.path.join("cache", "proxies"), max_bytes: int = 1024 * 1024 * 1024):
+        """
+        :param cache_dir: 缓存目录
+        :param max_bytes: 代理文件总大小上限
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index_path = os.path.join(cache_dir, self.INDEX_FILE)
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue()
+        self._thread = None
+        self._process = None
+        self._closed = False
+        self._pending: Set[str] = set()
+        self._index: Dict[str, Dict] = self._load_index()
+
+    def _load_index(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"读取代理缓存索引失败，将重新生成: {str(e)}")
+            return {}
+        # 丢弃代理文件已经不在的条目
+        return {key: entry for key, entry in index.items()
+                if entry["file"] is None or os.path.exists(entry["file"])}
+
+    def _save_index(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def _key(kind: str, source: str, box: Tuple[int, int]) -> str:
+        stat = os.stat(source)
+        raw = f"{kind}|{os.path.abspath(source)}|{stat.st_mtime_ns}|{stat.st_size}|{box[0]}x{box[1]}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def lookup(self, kind: str, source: str, box: Tuple[int, int]) -> Optional[Dict]:
+        """
+        查找可用的代理
+        :param kind: video 或 gif
+        :param source: 源文件
+        :param box: 显示区域
+        :return: {"file", "info"}；没有代理、正在生成或源文件不需要代理时返回 None
+        """
+        if not os.path.exists(source):
+            return None
+        key = self._key(kind, source, box)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None or entry["file"] is None:
+                return None
+            if not os.path.exists(entry["file"]):
+                del self._index[key]
+                return None
+            entry["last_used"] = time.time()
+            return {"file": entry["file"], "info": entry["info"]}
+
+    def request(self, kind: str, source: str, box: Tuple[int, int]):
+        """
+        在工作进程中生成代理，已有代理或正在生成时不重复提交
+        :param kind: video 或 gif
+        :param source: 源文件
+        :param box: 显示区域
+        """
+        if not os.path.exists(source):
+            return
+        key = self._key(kind, source, box)
+        with self._lock:
+            if self._closed or key in self._index or key in self._pending:
+                return
+            # 同一源文件、同一尺寸的旧版本代理已经失效
+            self._drop_stale(kind, source, box)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ProxyBuilder", daemon=True)
+                self._thread.start()
+            suffix = BUILDERS[kind][1]
+            target = os.path.join(self.cache_dir, key + suffix)
+            tmp_target = os.path.join(self.cache_dir, f"{key}.part{suffix}")
+            self._pending.add(key)
+        logging.info(f"开始生成{kind}代理: {source} -> {box}")
+        self._jobs.put((key, kind, source, tuple(box), tmp_target, target))
+
+    def _run(self):
+        """依次在子进程中执行排队的转换"""
+        # 显式使用 spawn：fork 一个已载入 OpenCV、带着多个线程的进程可能死锁
+        context = multiprocessing.get_context("spawn")
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            key, kind, source, box, tmp_target, target = job
+            try:
+                if not self._build(context, job):
+                    break
+            except Exception:
+                # 一个任务出错不能让线程退出，否则之后的请求都不会再执行
+                logging.exception(f"生成代理出错: {source}")
+                with self._lock:
+                    self._pending.discard(key)
+                if os.path.exists(tmp_target):
+                    os.remove(tmp_target)
+
+    def _build(self, context, job) -> bool:
+        """
+        在子进程中执行一个转换并登记结果
+        :return: 已经退出时返回 False
+        """
+        key, kind, source, box, tmp_target, target = job
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=run_builder, args=(kind, source, tmp_target, box, sender),
+                                  name="ProxyBuilder", daemon=True)
+        with self._lock:
+            if self._closed:
+                return False
+            self._process = process
+            process.start()
+        sender.close()
+        try:
+            ok, result = receiver.recv()
+        except EOFError:
+            ok, result = False, "工作进程已退出"
+        finally:
+            receiver.close()
+            process.join()
+            with self._lock:
+                self._process = None
+        self._on_built(key, kind, source, box, tmp_target, target, ok, result)
+        return True
+
+    def decode_gif(self, source: str, box: Optional[Tuple[int, int]] = None) -> GifFrames:
+        """
+        解码 GIF，有代理时读取代理，否则解码源文件并在后台生成代理；可作为 GifFrameCache 的解码函数
+        :param source: GIF 文件路径
+        :param box: 显示区域
+        :return: 帧数据
+        """
+        if box is not None:
+            proxy = self.lookup(GIF, source, box)
+            if proxy is not None:
+                try:
+                    return load_gif_proxy(proxy["file"])
+                except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+                    logging.warning(f"读取GIF代理失败，改读源文件: {str(e)}")
+            else:
+                self.request(GIF, source, box)
+        return decode_gif(source, box)
+
+    def video_source(self, video_file: str, box: Tuple[int, int],
+                     info: Optional[Dict] = None) -> Tuple[str, Optional[Dict]]:
+        """
+        选择要解码的视频文件，有代理时使用代理，否则使用源文件并在后台生成代理
+        :param video_file: 源视频
+        :param box: 显示区域
+        :param info: 源视频的元数据
+        :return: (要打开的文件, 它的元数据)
+        """
+        proxy = self.lookup(VIDEO, video_file, box)
+        if proxy is not None:
+            return proxy["file"], proxy["info"]
+        self.request(VIDEO, video_file, box)
+        return video_file, info
+
+    def _drop_stale(self, kind: str, source: str, box: Tuple[int, int]):
+        source = os.path.abspath(source)
+        for key in [k for k, e in self._index.items()
+                    if e["kind"] == kind and e["source"] == source and tuple(e["box"]) == tuple(box)]:
+            self._remove(key)
+
+    def _remove(self, key: str):
+        entry = self._index.pop(key)
+        if entry["file"] and os.path.exists(entry["file"]):
+            os.remove(entry["file"])
+
+    def _on_built(self, key: str, kind: str, source: str, box, tmp_target: str, target: str, ok: bool, result):
+        with self._lock:
+            self._pending.discard(key)
+            if not ok:
+                # 退出时被结束的转换不算失败
+                if not self._closed:
+                    logging.error(f"生成代理失败 {source}: {result}")
+                if os.path.exists(tmp_target):
+                    os.remove(tmp_target)
+                return
+            info = result
+            if info is None:
+                # 源文件不大于显示区域，记下来以免重复检查
+                file, size = None, 0
+            else:
+                os.replace(tmp_target, target)
+                file, size = target, os.path.getsize(target)
+            self._index[key] = {
+                "kind": kind, "source": os.path.abspath(source), "box": list(box),
+                "file": file, "bytes": size, "info": info, "last_used": time.time(),
+            }
+            self._evict()
+            self._save_index()
+        if file:
+            logging.info(f"已生成{kind}代理: {target}, {size // 1024} KB, {info}")
+
+    def _evict(self):
+        """总大小超过上限时按最近使用时间淘汰"""
+        total = sum(entry["bytes"] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._index[key]["bytes"]
+            self._remove(key)
+
+    def shutdown(self):
+        """退出时调用：结束正在转换的子进程（不等它完成），并保存使用时间"""
+        with self._lock:
+            self._closed = True
+            process = self._process
+            self._save_index()
+        self._jobs.put(None)
+        if process is not None and process.is_alive():
+            logging.info("退出时结束正在生成代理的工作进程")
+            process.terminate()
@@ -0,0 +1,221 @@
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.timer_engine import MonotonicCountdown
+
+# 调度器阶段
+IDLE = "idle"
+WORKING = "working"
+BREAK = "break"
+
+
+class ManualClock:
+    """可手动推进的时钟，用于模拟和测试，不依赖真实时间"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        """
+        推进时钟
+        :param seconds: 推进的秒数
+        """
+        self.now += seconds
+
+
+class BreakScheduler:
+    """
+    与界面无关的工作/休息状态机
+    时钟可注入，界面通过 subscribe 订阅事件，自身不依赖 Tk，可在无显示环境下驱动和压测
+
+    事件及参数:
+      state_changed(phase, running)      阶段或运行状态变化
+      tick(phase, remaining, progress)   每次 poll 时的剩余整秒数与进度
+      break_started()                    工作结束，进入休息
+      break_ended(completed)             休息结束，completed 表示是否自然走完
+      reset()                            计时器被重置
+    """
+
+    def __init__(self, work_seconds: float, break_seconds: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 wall_clock: Optional[Callable[[], float]] = None,
+                 auto_continue: bool = False):
+        """
+        :param work_seconds: 工作时长（秒）
+        :param break_seconds: 休息时长（秒）
+        :param clock: 单调时钟
+        :param wall_clock: 墙钟，用于检测系统休眠；默认真实时钟时用 time.time，否则与 clock 相同
+        :param auto_continue: 休息结束后是否自动开始下一轮工作
+        """
+        if wall_clock is None:
+            wall_clock = time.time if clock is time.monotonic else clock
+        self.clock = clock
+        self.auto_continue = auto_continue
+        self.work = MonotonicCountdown(work_seconds, clock=clock, wall_clock=wall_clock)
+        self.rest = MonotonicCountdown(break_seconds, clock=clock, wall_clock=wall_clock)
+        self.phase = IDLE
+        self.running = False
+        self.completed_cycles = 0
+        # 阶段进行中修改的时长，在该阶段结束或重置后生效
+        self._pending_work = None
+        self._pending_break = None
+        self._listeners: Dict[str, List[Callable]] = {}
+
+    def subscribe(self, event: str, callback: Callable):
+        """
+        订阅事件
+        :param event: 事件名
+        :param callback: 回调函数，参数见类说明
+        """
+        self._listeners.setdefault(event, []).append(callback)
+
+    def unsubscribe(self, event: str, callback: Callable):
+        """
+        取消订阅
+        :param event: 事件名
+        :param callback: 之前订阅的回调函数
+        """
+        if callback in self._listeners.get(event, []):
+            self._listeners[event].remove(callback)
+
+    def _emit(self, event: str, *args):
+        for callback in list(self._listeners.get(event, [])):
+            callback(*args)
+
+    def _set_state(self, phase: str, running: bool):
+        if (phase, running) == (self.phase, self.running):
+            return
+        self.phase = phase
+        self.running = running
+        self._emit("state_changed", phase, running)
+
+    @property
+    def current(self) -> MonotonicCountdown:
+        """当前阶段对应的倒计时"""
+        return self.rest if self.phase == BREAK else self.work
+
+    @property
+    def is_break(self) -> bool:
+        return self.phase == BREAK
+
+    def start(self):
+        """开始工作，或继续被暂停的阶段"""
+        if self.running:
+            return
+        if self.phase == IDLE:
+            self.work.start()
+            self._set_state(WORKING, True)
+        else:
+            self.current.start()
+            self._set_state(self.phase, True)
+
+    def pause(self):
+        """暂停当前阶段"""
+        if not self.running:
+            return
+        self.current.pause()
+        self._set_state(self.phase, False)
+
+    def reset(self, work_seconds: Optional[float] = None, break_seconds: Optional[float] = None):
+        """
+        停止并回到空闲状态
+        :param work_seconds: 新的工作时长（秒），不传则不变
+        :param break_seconds: 新的休息时长（秒），不传则不变
+        """
+        self.work.reset(work_seconds if work_seconds is not None else self._pending_work)
+        self.rest.reset(break_seconds if break_seconds is not None else self._pending_break)
+        self._pending_work = self._pending_break = None
+        self._set_state(IDLE, False)
+        self._emit("reset")
+
+    def set_durations(self, work_seconds: Optional[float] = None, break_seconds: Optional[float] = None):
+        """
+        修改时长，只影响尚未开始的阶段；正在进行（包括暂停中）的阶段保留原时长，
+        截止时间和进度都不变，新时长在该阶段结束或重置后生效
+        :param work_seconds: 新的工作时长（秒）
+        :param break_seconds: 新的休息时长（秒）
+        """
+        if work_seconds is not None:
+            if self.phase == WORKING:
+                self._pending_work = work_seconds
+            else:
+                self.work.reset(work_seconds)
+        if break_seconds is not None:
+            if self.phase == BREAK:
+                self._pending_break = break_seconds
+            else:
+                self.rest.reset(break_seconds)
+
+    def start_break(self):
+        """结束工作阶段，进入休息"""
+        self.work.pause()
+        self.rest.reset()
+        self.rest.start()
+        self._set_state(BREAK, True)
+        self._emit("break_started")
+
+    def end_break(self, completed: bool = False):
+        """
+        结束休息
+        :param completed: 休息是否自然走完（否则为用户手动结束）
+        """
+        if self.phase != BREAK:
+            return
+        self.rest.reset(self._pending_break)
+        self.work.reset(self._pending_work)
+        self._pending_work = self._pending_break = None
+        self.completed_cycles += 1
+        self._set_state(IDLE, False)
+        self._emit("break_ended", completed)
+        if self.auto_continue and self.phase == IDLE:
+            self.start()
+
+    def time_to_transition(self) -> Optional[float]:
+        """
+        距离当前阶段结束的秒数，未运行时返回 None
+        """
+        if not self.running:
+            return None
+        return self.current.remaining()
+
+    def poll(self) -> Optional[int]:
+        """
+        根据时钟推进状态机：发出 tick，到点时切换阶段
+        :return: 距离下一次需要 poll 的毫秒数；不在运行时返回 None
+        """
+        if not self.running:
+            return None
+
+        countdown = self.current
+        remaining = countdown.remaining()
+        progress = 1 - remaining / max(countdown.duration, 1)
+        self._emit("tick", self.phase, countdown.remaining_seconds(), progress)
+
+        if remaining <= 0:
+            if self.phase == WORKING:
+                self.start_break()
+            else:
+                self.end_break(completed=True)
+            if not self.running:
+                return None
+        return self.current.next_tick_delay()
+
+
+def simulate_cycles(scheduler: BreakScheduler, clock: ManualClock, cycles: int) -> int:
+    """
+    在手动时钟上快速跑完若干轮工作/休息，每个阶段直接跳到截止时间
+    :param scheduler: 调度器，须使用 clock 作为时钟且开启 auto_continue
+    :param clock: 手动时钟
+    :param cycles: 要模拟的轮数
+    :return: 实际完成的轮数
+    """
+    target = scheduler.completed_cycles + cycles
+    scheduler.start()
+    while scheduler.completed_cycles < target and scheduler.running:
+        # 多走一微秒，避免浮点误差让截止时间差一点点没到
+        clock.advance(scheduler.time_to_transition() + 1e-6)
+        scheduler.poll()
+    return scheduler.completed_cycles - (target - cycles)
@@ -0,0 +1,87 @@
+import sys
+import time
+import logging
+import threading
+import traceback
+
+from src.metrics import metrics
+
+
+if sys.platform == "win32":
+    import ctypes
+
+    def awake_clock() -> float:
+        """
+        系统醒着的时间（秒），系统休眠期间不走
+        Windows 的 time.monotonic 在休眠期间照常计时，这里改用 QueryUnbiasedInterruptTime
+        """
+        value = ctypes.c_ulonglong()
+        ctypes.windll.kernel32.QueryUnbiasedInterruptTime(ctypes.byref(value))
+        return value.value / 1e7
+else:
+    # Linux 的 CLOCK_MONOTONIC 与 macOS 的单调时钟在系统休眠期间本来就不走
+    awake_clock = time.monotonic
+
+
+class StallWatchdog:
+    """
+    主循环卡顿看门狗
+    Tk 线程定时写入心跳，后台线程发现心跳超过阈值未更新时，
+    通过 sys._current_frames 抓取 Tk 线程当前的调用栈写入日志；卡顿结束后记录总时长。
+    时间用系统休眠期间不走的时钟计算，休眠不会被当成卡顿；
+    看门狗线程自己迟到（例如 Tk 线程在一次很长的 C 调用中持有 GIL）照常按卡顿报告
+    """
+
+    def __init__(self, root, threshold: float = 0.5, interval: float = 0.1, clock=awake_clock):
+        """
+        必须在 Tk 线程中创建
+        :param root: Tk 根窗口
+        :param threshold: 判定为卡顿的心跳间隔（秒）
+        :param interval: 心跳间隔（秒）
+        :param clock: 系统休眠期间不走的单调时钟
+        """
+        self.root = root
+        self.threshold = threshold
+        self.interval = interval
+        self.clock = clock
+        self._tk_thread_id = threading.get_ident()
+        self._last_beat = clock()
+        self._stall_reported = False
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="StallWatchdog", daemon=True)
+
+    def start(self):
+        """开始心跳和监视"""
+        self._beat()
+        self._thread.start()
+
+    def stop(self):
+        """停止监视"""
+        self._stop_event.set()
+
+    def _beat(self):
+        now = self.clock()
+        lateness = now - self._last_beat - self.interval
+        if lateness >= self.threshold:
+            metrics.counter("mainloop.stalls").inc()
+            metrics.observe("mainloop.stall_ms", lateness * 1000)
+            if self._stall_reported:
+                logging.warning(f"主线程卡顿结束，共 {lateness * 1000:.0f} ms")
+        self._stall_reported = False
+        self._last_beat = now
+        if not self._stop_event.is_set():
+            self.root.after(int(self.interval * 1000), self._beat)
+
+    def _watch(self):
+        check_interval = self.interval / 2
+        while not self._stop_event.wait(check_interval):
+            now = self.clock()
+            stalled = now - self._last_beat - self.interval
+            if stalled >= self.threshold and not self._stall_reported:
+                self._stall_reported = True
+                self._report(stalled)
+
+    def _report(self, stalled: float):
+        frame = sys._current_frames().get(self._tk_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "（无法获取调用栈）\n"
+        logging.warning(f"主线程已卡顿 {stalled * 1000:.0f} ms，当前调用栈:\n{stack}")
@@ -0,0 +1,34 @@
+import time
+import logging
+
+
+class StartupProfiler:
+    """记录启动各阶段的耗时，首次绘制后写入日志"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self._last = self.start
+        self.phases = []
+        self.reported = False
+
+    def mark(self, name: str):
+        """
+        结束一个阶段：记录距上一次 mark 的耗时
+        :param name: 阶段名称
+        """
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def report(self):
+        """把各阶段耗时写入日志，只写一次"""
+        if self.reported:
+            return
+        self.reported = True
+        total = (self._last - self.start) * 1000
+        lines = "\n".join(f"  {name}: {seconds * 1000:.1f} ms" for name, seconds in self.phases)
+        logging.info(f"启动耗时 {total:.1f} ms:\n{lines}")
+
+
+# 进程内唯一的启动计时器，越早导入计时越完整
+startup_profiler = StartupProfiler()
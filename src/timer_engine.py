@@ -0,0 +1,108 @@
+import math
+import time
+
+
+class MonotonicCountdown:
+    """
+    基于截止时间的倒计时
+    剩余时间总是由 time.monotonic() 计算，而不是每次回调减一秒，
+    因此 Tk 调度延迟、GC 停顿或主循环被阻塞都不会累积成误差
+    """
+
+    # 墙钟比单调时钟多走超过该秒数时，视为系统休眠过（Linux 的单调时钟休眠时不走）
+    SUSPEND_THRESHOLD = 2.0
+    # 刷新回调落在整秒边界之后的余量（毫秒），避免刚好差一点而显示旧的秒数
+    TICK_MARGIN_MS = 5
+
+    def __init__(self, duration: float, clock=time.monotonic, wall_clock=time.time):
+        """
+        :param duration: 倒计时总时长（秒）
+        :param clock: 单调时钟函数，测试时可注入
+        :param wall_clock: 墙钟函数，用于检测系统休眠
+        """
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.duration = duration
+        self.running = False
+        self._remaining = float(duration)
+        self._deadline = None
+        self._last_mono = None
+        self._last_wall = None
+
+    def _sync(self):
+        """检测上次检查以来是否发生过系统休眠，休眠的时间也算作已经过去"""
+        now_mono = self.clock()
+        now_wall = self.wall_clock()
+        if self._last_mono is not None:
+            suspended = (now_wall - self._last_wall) - (now_mono - self._last_mono)
+            if suspended > self.SUSPEND_THRESHOLD:
+                self._deadline -= suspended
+        self._last_mono = now_mono
+        self._last_wall = now_wall
+        return now_mono
+
+    def start(self):
+        """开始或继续倒计时"""
+        if self.running:
+            return
+        self._last_mono = None
+        now = self._sync()
+        self._deadline = now + self._remaining
+        self.running = True
+
+    def pause(self):
+        """暂停倒计时，保留剩余时间"""
+        if not self.running:
+            return
+        self._remaining = self.remaining()
+        self.running = False
+        self._deadline = None
+
+    def reset(self, duration: float = None):
+        """
+        停止并重置倒计时
+        :param duration: 新的总时长（秒），不传则沿用原时长
+        """
+        if duration is not None:
+            self.duration = duration
+        self.running = False
+        self._remaining = float(self.duration)
+        self._deadline = None
+
+    def remaining(self) -> float:
+        """
+        剩余时间（秒，浮点数，不小于 0）
+        """
+        if not self.running:
+            return self._remaining
+        now = self._sync()
+        return max(0.0, self._deadline - now)
+
+    def remaining_seconds(self) -> int:
+        """
+        用于显示的剩余整秒数（向上取整，显示 00:01 直到真正到点）
+        """
+        return int(math.ceil(self.remaining()))
+
+    def elapsed(self) -> float:
+        """
+        已经过去的时间（秒）
+        """
+        return self.duration - self.remaining()
+
+    def expired(self) -> bool:
+        """
+        倒计时是否已经结束
+        """
+        return self.remaining() <= 0
+
+    def next_tick_delay(self) -> int:
+        """
+        到下一个整秒边界的毫秒数，用于安排下一次界面刷新
+        :return: 毫秒数，至少为 1
+        """
+        remaining = self.remaining()
+        fraction = remaining - math.floor(remaining)
+        if fraction == 0:
+            fraction = 1.0
+        return max(1, int(fraction * 1000) + self.TICK_MARGIN_MS)
@@ -0,0 +1,327 @@
+import time
+import queue
+import logging
+import threading
+from typing import Optional, Tuple
+
+import cv2
+from PIL import Image
+
+from src.metrics import metrics
+
+
+class FrameScaler:
+    """
+    按显示区域计算保持宽高比的目标尺寸（多余部分留黑边），
+    并根据缩放比例选择插值方式
+    """
+
+    # 缩小到原尺寸的该比例以下时改用最近邻插值，画质差别不明显但开销小得多
+    HEAVY_DOWNSCALE = 0.5
+
+    def __init__(self, source_width: int, source_height: int):
+        """
+        :param source_width: 原始帧宽度
+        :param source_height: 原始帧高度
+        """
+        self.source_width = source_width
+        self.source_height = source_height
+
+    def fit(self, box_width: int, box_height: int) -> Optional[Tuple[Tuple[int, int], int, float]]:
+        """
+        计算放入显示区域的目标尺寸
+        :param box_width: 显示区域宽度
+        :param box_height: 显示区域高度
+        :return: ((宽, 高), 插值方式, 缩放比例)，区域或原始尺寸无效时返回 None
+        """
+        if box_width <= 1 or box_height <= 1 or self.source_width <= 0 or self.source_height <= 0:
+            return None
+        scale = min(box_width / self.source_width, box_height / self.source_height)
+        size = (max(1, round(self.source_width * scale)), max(1, round(self.source_height * scale)))
+        interpolation = cv2.INTER_NEAREST if scale < self.HEAVY_DOWNSCALE else cv2.INTER_LINEAR
+        return size, interpolation, scale
+
+
+def probe_video(video_file: str) -> Optional[dict]:
+    """
+    读取视频的元数据
+    :param video_file: 视频文件路径
+    :return: {"fps", "width", "height", "frame_count", "duration"}，无法打开时返回 None
+    """
+    cap = cv2.VideoCapture(video_file)
+    try:
+        if not cap.isOpened():
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        return {
+            "fps": fps,
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "frame_count": frame_count,
+            "duration": frame_count / fps if frame_count > 0 else None,
+        }
+    finally:
+        cap.release()
+
+
+class VideoDecoder(threading.Thread):
+    """
+    后台视频解码线程
+    在工作线程中完成读取、缩放、BGR→RGB 转换和 PIL 图像构建，
+    结果放入有界队列；队列满时生产者阻塞等待（背压），Tk 线程只需做最后的 PhotoImage 替换。
+    设置了播放时钟后，已经落后于时钟的帧只用 grab 跳过，不解码出图像、不缩放也不转换，
+    解码本身跟不上时画面跳帧追上时钟，而不是越来越落后于音频
+    """
+
+    # 连续读取失败超过该次数视为文件损坏，停止解码
+    MAX_READ_FAILURES = 3
+
+    def __init__(self, video_file: str, queue_size: int = 8, info: Optional[dict] = None):
+        """
+        :param video_file: 视频文件路径
+        :param queue_size: 帧队列容量
+        :param info: 已缓存的元数据（probe_video 的结果），给出时不再从文件读取
+        """
+        super().__init__(daemon=True, name="VideoDecoder")
+        self.video_file = video_file
+        self.cap = cv2.VideoCapture(video_file)
+        self.frames = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._size_lock = threading.Lock()
+        self._target = None
+        self._low_res_requested = False
+        # 播放时钟，由 FramePacer 设置；为 None 时不跳帧（例如预加载时）
+        self.clock: Optional["PresentationClock"] = None
+        # 因落后于播放时钟而跳过的帧数
+        self.skipped = 0
+
+        if info:
+            self.frame_width = info["width"]
+            self.frame_height = info["height"]
+            self.fps = info["fps"]
+        else:
+            self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 25
+        self.scaler = FrameScaler(self.frame_width, self.frame_height)
+
+    def is_opened(self) -> bool:
+        """视频文件是否成功打开"""
+        return self.cap.isOpened()
+
+    def fit_to(self, box_width: int, box_height: int):
+        """
+        设置显示区域大小，之后解码的帧按保持宽高比的尺寸缩放
+        只需在显示区域变化（<Configure>）时调用
+        :param box_width: 显示区域宽度
+        :param box_height: 显示区域高度
+        """
+        target = self.scaler.fit(box_width, box_height)
+        if target is None:
+            return
+        with self._size_lock:
+            self._target = target
+            if target[2] < FrameScaler.HEAVY_DOWNSCALE:
+                self._low_res_requested = True
+
+    def _request_low_res(self, size: Tuple[int, int]):
+        """
+        请求解码器直接输出低分辨率画面，只有部分后端支持，
+        不支持时 set 返回 False，仍由 resize 完成缩放
+        """
+        if self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0]) and self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1]):
+            logging.info(f"解码器已切换到低分辨率输出: {size}")
+
+    def _put(self, item) -> bool:
+        """放入队列，队列满时等待，停止时放弃"""
+        while not self._stop_event.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self):
+        failures = 0
+        # 连续的帧序号，循环播放时不归零，用于计算显示时间戳
+        frame_index = 0
+        try:
+            while not self._stop_event.is_set():
+                decode_start = time.perf_counter()
+                # 显示时间戳（秒）
+                pts = frame_index / self.fps
+                clock = self.clock
+                late = clock is not None and clock.time() - pts > 1 / self.fps
+                if late:
+                    ret, frame = self.cap.grab(), None
+                else:
+                    ret, frame = self.cap.read()
+                if not ret:
+                    # 视频结束，从头开始播放
+                    failures += 1
+                    if failures > self.MAX_READ_FAILURES:
+                        logging.error(f"视频解码失败: {self.video_file}")
+                        break
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    continue
+                failures = 0
+                frame_index += 1
+                if late:
+                    self.skipped += 1
+                    continue
+
+                with self._size_lock:
+                    target = self._target
+                    low_res_requested = self._low_res_requested
+                    self._low_res_requested = False
+                if low_res_requested:
+                    self._request_low_res(target[0])
+
+                # 先缩小再转换颜色，颜色转换只需处理缩小后的像素
+                if target and (frame.shape[1], frame.shape[0]) != target[0]:
+                    frame = cv2.resize(frame, target[0], interpolation=target[1])
+
+                # 将BGR格式转换为RGB格式
+                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+                image = Image.fromarray(frame_rgb)
+                metrics.observe("video.decode_ms", (time.perf_counter() - decode_start) * 1000)
+                if not self._put((pts, image)):
+                    break
+        finally:
+            self.cap.release()
+
+    def get_frame(self) -> Optional[Tuple[float, Image.Image]]:
+        """
+        取出一帧，没有就绪的帧时返回 None，不阻塞
+        :return: (显示时间戳, PIL 图像) 或 None
+        """
+        try:
+            return self.frames.get_nowait()
+        except queue.Empty:
+            return None
+
+    def stop(self, timeout: float = 1.0):
+        """
+        停止解码线程并释放视频文件
+        :param timeout: 等待线程退出的最长秒数
+        """
+        self._stop_event.set()
+        # 清空队列，唤醒可能阻塞在 put 上的生产者
+        while self.get_frame() is not None:
+            pass
+        if self.ident is None:
+            # 线程从未启动，直接释放
+            self.cap.release()
+        elif self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+
+class PresentationClock:
+    """播放时钟：从开始播放起经过的媒体时间，暂停期间不走"""
+
+    def __init__(self, clock=time.monotonic):
+        """
+        :param clock: 单调时钟函数
+        """
+        self.clock = clock
+        self._start = None
+        self._paused_at = None
+
+    def start(self):
+        """从 0 开始计时"""
+        self._start = self.clock()
+        self._paused_at = None
+
+    def pause(self):
+        if self._start is not None and self._paused_at is None:
+            self._paused_at = self.clock()
+
+    def resume(self):
+        if self._paused_at is not None:
+            self._start += self.clock() - self._paused_at
+            self._paused_at = None
+
+    def time(self) -> float:
+        """
+        当前媒体时间（秒）
+        """
+        if self._start is None:
+            return 0.0
+        now = self._paused_at if self._paused_at is not None else self.clock()
+        return now - self._start
+
+
+class FramePacer:
+    """
+    按显示时间戳安排帧的呈现
+    每帧对照播放时钟：未到时间的等待，已被后一帧超过的直接丢弃；
+    播放时钟同时交给解码线程，解码跟不上时由解码线程跳过已落后的帧。
+    这样解码或绘制变慢时画面会跳帧而不是整体变慢，与音频保持同步
+    """
+
+    def __init__(self, decoder: VideoDecoder, clock=time.monotonic):
+        """
+        :param decoder: 视频解码线程
+        :param clock: 单调时钟函数
+        """
+        self.decoder = decoder
+        self.clock = PresentationClock(clock)
+        decoder.clock = self.clock
+        self.frame_interval = 1.0 / decoder.fps
+        self._pending = None
+        self.presented = 0
+        self.dropped = 0
+        self.late = 0
+
+    def start(self):
+        self.clock.start()
+
+    def pause(self):
+        self.clock.pause()
+
+    def resume(self):
+        self.clock.resume()
+
+    def next_frame(self) -> Tuple[Optional[Image.Image], int]:
+        """
+        取出当前应显示的帧
+        :return: (要显示的图像或 None, 距离下一帧的毫秒数)
+        """
+        now = self.clock.time()
+        due = None
+        while True:
+            if self._pending is None:
+                self._pending = self.decoder.get_frame()
+                if self._pending is None:
+                    break
+            if self._pending[0] > now:
+                break
+            # 后面还有已到时间的帧，前一帧就不再显示
+            if due is not None:
+                self.dropped += 1
+            due = self._pending
+            self._pending = None
+
+        image = None
+        if due is not None:
+            image = due[1]
+            self.presented += 1
+            if now - due[0] > self.frame_interval:
+                self.late += 1
+
+        if self._pending is not None:
+            delay = (self._pending[0] - now) * 1000
+        else:
+            # 解码跟不上，稍后再取
+            delay = self.frame_interval * 500
+        return image, max(1, int(delay))
+
+    def stats(self) -> dict:
+        """
+        播放统计
+        :return: 显示、丢弃（包括解码线程跳过的）、迟到的帧数
+        """
+        return {"presented": self.presented, "dropped": self.dropped + self.decoder.skipped, "late": self.late}
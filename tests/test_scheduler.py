@@ -0,0 +1,182 @@
+"""无显示环境下在手动时钟上验证调度器"""
+from src.scheduler import BREAK, IDLE, WORKING, BreakScheduler, ManualClock, simulate_cycles
+from src.timer_engine import MonotonicCountdown
+
+
+def make_scheduler(work=60, rest=30, **kwargs):
+    clock = ManualClock()
+    scheduler = BreakScheduler(work, rest, clock=clock, **kwargs)
+    events = []
+    for name in ("state_changed", "break_started", "break_ended", "reset"):
+        scheduler.subscribe(name, lambda *args, name=name: events.append((name,) + args))
+    return scheduler, clock, events
+
+
+def test_work_break_idle_transitions():
+    scheduler, clock, events = make_scheduler()
+    scheduler.start()
+    assert events == [("state_changed", WORKING, True)]
+
+    clock.advance(59.5)
+    assert scheduler.poll() is not None
+    assert scheduler.phase == WORKING
+
+    clock.advance(0.5)
+    scheduler.poll()
+    assert scheduler.phase == BREAK
+    assert events[1:] == [("state_changed", BREAK, True), ("break_started",)]
+
+    clock.advance(30)
+    assert scheduler.poll() is None
+    assert scheduler.phase == IDLE and not scheduler.running
+    assert events[3:] == [("state_changed", IDLE, False), ("break_ended", True)]
+    assert scheduler.completed_cycles == 1
+
+
+def test_tick_reports_remaining_seconds_and_progress():
+    scheduler, clock, _ = make_scheduler()
+    ticks = []
+    scheduler.subscribe("tick", lambda *args: ticks.append(args))
+    scheduler.start()
+    clock.advance(15.25)
+    delay = scheduler.poll()
+    phase, remaining, progress = ticks[-1]
+    assert (phase, remaining) == (WORKING, 45)
+    assert abs(progress - 15.25 / 60) < 1e-9
+    # 下一次刷新落在整秒边界之后
+    assert delay == 750 + MonotonicCountdown.TICK_MARGIN_MS
+
+
+def test_end_break_manually():
+    scheduler, clock, events = make_scheduler()
+    scheduler.start()
+    scheduler.start_break()
+    clock.advance(5)
+    scheduler.end_break()
+    assert scheduler.phase == IDLE
+    assert events[-1] == ("break_ended", False)
+    assert scheduler.work.remaining() == 60
+
+
+def test_pause_and_resume_inside_break():
+    scheduler, clock, events = make_scheduler()
+    scheduler.start()
+    scheduler.start_break()
+    clock.advance(10)
+    scheduler.pause()
+    assert events[-1] == ("state_changed", BREAK, False)
+    assert scheduler.poll() is None
+
+    # 暂停期间时间不计入休息
+    clock.advance(100)
+    assert scheduler.rest.remaining() == 20
+
+    scheduler.start()
+    assert events[-1] == ("state_changed", BREAK, True)
+    clock.advance(19)
+    scheduler.poll()
+    assert scheduler.phase == BREAK
+    clock.advance(1)
+    scheduler.poll()
+    assert scheduler.phase == IDLE
+    assert events[-1] == ("break_ended", True)
+
+
+def test_set_durations_while_phase_running():
+    scheduler, clock, _ = make_scheduler()
+    scheduler.start()
+    clock.advance(10)
+
+    # 正在进行的工作倒计时不受影响，新的休息时长在下一次休息生效
+    scheduler.set_durations(work_seconds=120, break_seconds=45)
+    assert scheduler.work.remaining() == 50
+    clock.advance(50)
+    scheduler.poll()
+    assert scheduler.phase == BREAK
+    assert scheduler.rest.remaining() == 45
+
+    # 休息中修改休息时长不改变本次休息的截止时间
+    scheduler.set_durations(break_seconds=300)
+    assert scheduler.rest.remaining() == 45
+    clock.advance(45)
+    scheduler.poll()
+    assert scheduler.phase == IDLE
+    assert scheduler.work.remaining() == 120
+    assert scheduler.rest.remaining() == 300
+
+
+def test_set_durations_keeps_progress_of_running_phase():
+    scheduler, clock, _ = make_scheduler(work=1800, rest=300)
+    ticks = []
+    scheduler.subscribe("tick", lambda *args: ticks.append(args))
+    scheduler.start()
+    clock.advance(900)
+
+    # 缩短或延长工作时长都不影响本阶段的进度
+    scheduler.set_durations(work_seconds=600)
+    scheduler.poll()
+    assert ticks[-1] == (WORKING, 900, 0.5)
+    scheduler.set_durations(work_seconds=3600)
+    scheduler.poll()
+    assert ticks[-1] == (WORKING, 900, 0.5)
+
+    clock.advance(900)
+    scheduler.poll()
+    assert scheduler.phase == BREAK
+    scheduler.set_durations(break_seconds=60)
+    clock.advance(150)
+    scheduler.poll()
+    assert ticks[-1] == (BREAK, 150, 0.5)
+
+    # 重置后新时长生效
+    scheduler.reset()
+    assert scheduler.work.remaining() == 3600
+    assert scheduler.rest.remaining() == 60
+
+
+def test_set_durations_when_idle():
+    scheduler, _, _ = make_scheduler()
+    scheduler.set_durations(work_seconds=90, break_seconds=20)
+    assert scheduler.work.remaining() == 90
+    assert scheduler.rest.remaining() == 20
+
+
+def test_simulate_cycles_with_auto_continue():
+    scheduler, clock, events = make_scheduler(auto_continue=True)
+    assert simulate_cycles(scheduler, clock, 3) == 3
+    assert scheduler.phase == WORKING and scheduler.running
+    assert [event for event in events if event[0] == "break_ended"] == [("break_ended", True)] * 3
+    assert clock.now >= 3 * 90
+
+
+def test_countdown_catches_up_after_suspend():
+    mono, wall = ManualClock(), ManualClock(1000.0)
+    countdown = MonotonicCountdown(60, clock=mono, wall_clock=wall)
+    countdown.start()
+    mono.advance(10)
+    wall.advance(10)
+    assert countdown.remaining() == 50
+
+    # 系统休眠 30 秒：墙钟在走，单调时钟不走
+    wall.advance(30)
+    assert countdown.remaining() == 20
+
+    # 低于阈值的墙钟抖动（例如校时）不算休眠
+    wall.advance(MonotonicCountdown.SUSPEND_THRESHOLD / 2)
+    assert countdown.remaining() == 20
+
+    # 休眠超过剩余时间时倒计时直接结束
+    wall.advance(100)
+    assert countdown.expired()
+
+
+def test_paused_countdown_ignores_suspend():
+    mono, wall = ManualClock(), ManualClock()
+    countdown = MonotonicCountdown(60, clock=mono, wall_clock=wall)
+    countdown.start()
+    mono.advance(10)
+    wall.advance(10)
+    countdown.pause()
+    wall.advance(600)
+    countdown.start()
+    assert countdown.remaining() == 50